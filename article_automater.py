@@ -1,69 +1,73 @@
 import os
-import json
 import csv
+import glob
+import json
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+import queue
+import asyncio
+import shutil
+import argparse
+import threading
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+
+from browser_profile import PROFILES, create_chrome, report_pages
+from csv_writer import BatchedCsvWriter
+from leases import LeaseStore, worker_id
+from progress_store import ProgressStore
+from readiness import button_state_changed, report_waits, wait_for_document, wait_until
+from session import BASE_URL, get_authenticated, seed_driver
+from timing import ask, install_queued_output, report_spans, span, stop_queued_output, track_span
+from url_canon import canonical_key, read_item_rows
 
 READING_TIME_SECONDS = 1
 
+COMPLETED_FIELDNAMES = ['title', 'url', 'type', 'completed_at']
+
+# Multi-tab mode: window handles per Chrome instance, and Chrome instances per host
+TABS_PER_BROWSER = 1
+BROWSERS_PER_HOST = 1
+
+# 'lean' blocks images, media, fonts and third-party hosts; 'full' is a stock 1920x1080 Chrome
+BROWSER_PROFILE = 'lean'
+
+# Sharded runs: each process claims articles through leases under SHARD_DIR and
+# writes SHARD_DIR/completed_articles.<worker>.csv until 'merge' folds them
+# into completed_articles.csv
+SHARD_DIR = None
+WORKER_ID = None
+LEASE_TTL = 300
+LEASE_POLL = 30
+
 class ArticleAutomater:
-    def __init__(self, cookies_file):
+    def __init__(self, cookies_file, progress_db='progress.db', leases=None):
         self.cookies_file = cookies_file
         self.driver = None
+        self.store = ProgressStore(progress_db)
+        self.completed_writers = {}
+        self.leases = leases
+        # Keys of articles passed over because another worker holds them
+        self.deferred = []
 
     def setup_driver(self, headless=True):
-        options = Options()
-        if headless:
-            options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--window-size=1920,1080')
-
-        chromedriver_path = 'chromedriver.exe'
-        if os.path.exists(chromedriver_path):
-            service = Service(chromedriver_path)
-        else:
-            try:
-                service = Service(ChromeDriverManager().install())
-            except Exception as e:
-                print(f"ChromeDriver error: {e}")
-                return False
-        self.driver = webdriver.Chrome(service=service, options=options)
+        self.driver = self.create_driver(headless)
+        return self.driver is not None
+
+    def create_driver(self, headless=True):
+        """Start a Chrome driver seeded with the saved cookies, or None on failure"""
+        # The visible browser is for manual login, so it keeps images and the full window
+        driver = create_chrome(headless, BROWSER_PROFILE if headless else 'full')
+        if not driver:
+            return None
 
         if self.cookies_file and os.path.exists(self.cookies_file):
-            self.load_cookies()
-        return True
+            seed_driver(driver, self.cookies_file)
+        return driver
 
     def load_cookies(self):
-        try:
-            with open(self.cookies_file, 'r') as f:
-                cookies = json.load(f)
-
-            self.driver.get("https://www.geeksforgeeks.org")
-            time.sleep(2)
-
-            for cookie in cookies:
-                try:
-                    if 'expiry' in cookie and cookie['expiry']:
-                        cookie['expiry'] = int(cookie['expiry'])
-
-                    self.driver.add_cookie(cookie)
-                except Exception as e:
-                    pass
-
-            print("Cookies loaded")
-            return True
-
-        except Exception as e:
-            print(f"Cookie error: {e}")
-            return False
+        return seed_driver(self.driver, self.cookies_file)
 
     def save_cookies(self):
         cookies = self.driver.get_cookies()
@@ -73,11 +77,11 @@ class ArticleAutomater:
 
     def test_authentication(self):
         try:
-            self.driver.get("https://www.geeksforgeeks.org/batch/dsa-jiit")
-            time.sleep(3)
-
-            page_text = self.driver.page_source.lower()
-            if "login" in page_text or "sign in" in page_text:
+            authenticated = get_authenticated(
+                self.driver, f"{BASE_URL}/batch/dsa-jiit", self.cookies_file,
+                wait=lambda d: wait_for_document(d, 3, 'auth check')
+            )
+            if not authenticated:
                 print("Authentication failed - cookies may be expired")
                 return False
             else:
@@ -91,27 +95,26 @@ class ArticleAutomater:
     def refresh_authentication(self):
         """Handle re-authentication when cookies are invalid"""
         print("Please log in manually in the browser window...")
-        input("Press Enter after logging in to save new cookies...")
+        ask("Press Enter after logging in to save new cookies...")
 
         self.save_cookies()
         print("New cookies saved!")
 
         return self.test_authentication()
 
-    def load_article(self, url):
+    def load_article(self, url, driver=None):
+        driver = driver or self.driver
         print(f"Loading: {url}")
-        self.driver.get(url)
-
-        WebDriverWait(self.driver, 10).until(
+        wait_for_body = lambda d: WebDriverWait(d, 10).until(
             EC.presence_of_element_located((By.TAG_NAME, 'body'))
         )
 
-        if "login" in self.driver.page_source.lower():
+        if not get_authenticated(driver, url, self.cookies_file, wait=wait_for_body):
             print("Access denied")
             return False
 
         try:
-            title_elem = self.driver.find_element(By.TAG_NAME, 'h1')
+            title_elem = driver.find_element(By.TAG_NAME, 'h1')
             title = title_elem.text
             print(f"Article: {title}")
         except:
@@ -121,106 +124,323 @@ class ArticleAutomater:
         print("Article loaded successfully")
         return True
 
-    def study_articles_session(self, items_csv, completed_csv):
-        articles = []
-        completed_urls = set()
-
-        if os.path.exists(completed_csv):
-            with open(completed_csv, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('url'):
-                        completed_urls.add(row['url'])
-
-        with open(items_csv, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get('type') == 'article' and row.get('url'):
-                    articles.append(row)
-
-        pending_articles = [article for article in articles if article['url'] not in completed_urls]
-
-        print(f"Found {len(articles)} total articles")
-        print(f"Already completed: {len(completed_urls)}")
+    def load_pending_articles(self, items_csv, completed_csv):
+        # Only rows appended to the CSVs since the last import are read into the progress store
+        self.store.import_items_csv(items_csv)
+        self.store.import_completed_csv(completed_csv)
+
+        pending_articles = self.store.pending_items('article')
+        if self.leases:
+            pending_articles = [article for article in pending_articles
+                                if not self.leases.is_done(canonical_key(article['url']))]
+        counts = self.store.counts()
+        total_articles = sum(count for (item_type, _), count in counts.items() if item_type == 'article')
+        completed_count = sum(count for (_, status), count in counts.items() if status == 'completed')
+
+        print(f"Found {total_articles} total articles")
+        print(f"Already completed: {completed_count}")
         print(f"Remaining to read: {len(pending_articles)}")
 
         if not pending_articles:
             print("All articles have been read! 🎉")
+
+        return pending_articles
+
+    def claim(self, article):
+        """In a sharded run, lease the article; False if it is done or another worker holds it"""
+        if not self.leases:
+            return True
+        key = canonical_key(article['url'])
+        if self.leases.claim(key):
+            return True
+        if not self.leases.is_done(key):
+            self.deferred.append(key)
+        return False
+
+    def unclaim(self, article):
+        if self.leases:
+            self.leases.release(canonical_key(article['url']))
+
+    def study_articles_session(self, items_csv, completed_csv):
+        pending_articles = self.load_pending_articles(items_csv, completed_csv)
+        if not pending_articles:
             return
 
         for i, article in enumerate(pending_articles, 1):
             title = article.get('title', 'Unknown')
-            url = article['url']
-            if not url.startswith('http'):
-                url = f"https://www.geeksforgeeks.org{url}"
+            url = article_url(article)
 
+            if not self.claim(article):
+                continue
             print(f"[{i}/{len(pending_articles)}] {title}")
 
-            success = self.load_article(url)
-            if not success:
-                continue
+            with track_span(article.get('track_slug') or title):
+                success = self.load_article(url)
+                if not success:
+                    self.unclaim(article)
+                    continue
 
-            print(f"Reading for {READING_TIME_SECONDS}s...")
-            time.sleep(READING_TIME_SECONDS)
+                print(f"Reading for {READING_TIME_SECONDS}s...")
+                with span('read sleep'):
+                    time.sleep(READING_TIME_SECONDS)
 
-            marked_complete = self.mark_article_complete()
-            if marked_complete:
-                self.add_to_completed(completed_csv, article)
-                print(f"✅ Article completed and tracked: {title}")
-            else:
-                print(f"⚠️  Article read but could not mark as complete: {title}")
+                marked_complete = self.mark_article_complete()
+                if marked_complete:
+                    self.add_to_completed(completed_csv, article)
+                    print(f"✅ Article completed and tracked: {title}")
+                else:
+                    self.unclaim(article)
+                    print(f"⚠️  Article read but could not mark as complete: {title}")
 
             print(f"Done article {i}")
 
         print("Study session complete")
 
+    async def study_articles_async(self, items_csv, completed_csv, concurrency=3, item_timeout=60):
+        """Keep up to `concurrency` articles in flight, each in its own browser session.
+
+        Selenium calls run in worker threads; reading time is an asyncio sleep so
+        it does not hold a thread. Completed rows are written from the event loop,
+        one at a time, so completed_articles.csv stays consistent.
+        """
+        pending_articles = self.load_pending_articles(items_csv, completed_csv)
+        if not pending_articles:
+            return
+
+        concurrency = max(1, min(concurrency, len(pending_articles)))
+        drivers = asyncio.Queue()
+        drivers.put_nowait(self.driver)
+        extra_drivers = await asyncio.gather(
+            *(asyncio.to_thread(self.create_driver, True) for _ in range(concurrency - 1))
+        )
+        for driver in extra_drivers:
+            if driver:
+                drivers.put_nowait(driver)
+        print(f"Studying with {drivers.qsize()} concurrent sessions")
+
+        all_drivers = [self.driver] + [driver for driver in extra_drivers if driver]
+        completed = 0
+
+        async def study(article, driver):
+            url = article_url(article)
+            if not await asyncio.to_thread(self.load_article, url, driver):
+                return False
+            await asyncio.sleep(READING_TIME_SECONDS)
+            return await asyncio.to_thread(self.mark_article_complete, driver)
+
+        async def process(i, article):
+            nonlocal completed
+            title = article.get('title', 'Unknown')
+            driver = await drivers.get()
+            if not self.claim(article):
+                drivers.put_nowait(driver)
+                return
+            healthy = True
+            marked_complete = False
+            try:
+                print(f"[{i}/{len(pending_articles)}] {title}")
+                marked_complete = await asyncio.wait_for(study(article, driver), item_timeout)
+                if marked_complete:
+                    self.add_to_completed(completed_csv, article)
+                    completed += 1
+                    print(f"✅ Article completed and tracked: {title}")
+                else:
+                    print(f"⚠️  Article read but could not mark as complete: {title}")
+            except asyncio.TimeoutError:
+                # The Selenium call may still be running in its thread, so retire this driver
+                print(f"⏱️  Timed out after {item_timeout}s: {title}")
+                healthy = False
+            except Exception as e:
+                print(f"Error studying {title}: {e}")
+            finally:
+                if not marked_complete:
+                    self.unclaim(article)
+                if healthy:
+                    drivers.put_nowait(driver)
+                else:
+                    replacement = await asyncio.to_thread(self.create_driver, True)
+                    if replacement:
+                        all_drivers.append(replacement)
+                        drivers.put_nowait(replacement)
+
+        await asyncio.gather(*(process(i, article) for i, article in enumerate(pending_articles, 1)))
+
+        for driver in all_drivers:
+            if driver is not self.driver:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+        print(f"Study session complete: {completed}/{len(pending_articles)} articles marked")
+
+    def study_articles_tabs(self, items_csv, completed_csv, tabs_per_browser=TABS_PER_BROWSER,
+                            browsers_per_host=BROWSERS_PER_HOST):
+        """Study articles in several tabs of each browser, round-robin.
+
+        While one tab waits out its reading time, the others load their next
+        article or mark theirs complete. The first browser is self.driver.
+        """
+        pending_articles = self.load_pending_articles(items_csv, completed_csv)
+        if not pending_articles:
+            return
+
+        article_queue = queue.Queue()
+        for i, article in enumerate(pending_articles, 1):
+            article_queue.put((i, article))
+
+        lock = threading.Lock()
+        stats = {'completed': 0}
+        start = time.time()
+
+        def run_browser(driver):
+            self.run_tab_scheduler(driver, tabs_per_browser, article_queue, len(pending_articles),
+                                   lambda article: self.record_completed(completed_csv, article, lock, stats))
+
+        threads = []
+        for browser_idx in range(browsers_per_host):
+            driver = self.driver if browser_idx == 0 else self.create_driver(True)
+            if not driver:
+                print(f"Failed to start browser {browser_idx + 1}")
+                continue
+            thread = threading.Thread(target=run_browser, args=(driver,), daemon=True)
+            thread.driver = driver
+            threads.append(thread)
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+            if thread.driver is not self.driver:
+                thread.driver.quit()
+
+        elapsed = time.time() - start
+        rate = stats['completed'] / elapsed * 60 if elapsed else 0
+        print(f"Study session complete: {stats['completed']}/{len(pending_articles)} articles marked "
+              f"with {browsers_per_host}x{tabs_per_browser} tabs ({rate:.1f} articles/min)")
+
+    def run_tab_scheduler(self, driver, tabs_per_browser, article_queue, total, on_completed):
+        """Round-robin pending articles over tabs_per_browser window handles of one driver"""
+        handles = [driver.current_window_handle]
+        for _ in range(tabs_per_browser - 1):
+            driver.switch_to.new_window('tab')
+            handles.append(driver.current_window_handle)
+
+        tabs = [{'handle': handle, 'article': None, 'ready_at': 0} for handle in handles]
+
+        while True:
+            progressed = False
+            for tab in tabs:
+                if tab['article'] is None:
+                    try:
+                        i, article = article_queue.get_nowait()
+                    except queue.Empty:
+                        continue
+                    if not self.claim(article):
+                        progressed = True
+                        continue
+                    driver.switch_to.window(tab['handle'])
+                    print(f"[{i}/{total}] {article.get('title', 'Unknown')}")
+                    try:
+                        loaded = self.load_article(article_url(article), driver)
+                    except Exception as e:
+                        print(f"Load error: {e}")
+                        loaded = False
+                    if loaded:
+                        tab['article'] = article
+                        tab['ready_at'] = time.time() + READING_TIME_SECONDS
+                    else:
+                        self.unclaim(article)
+                    progressed = True
+                elif time.time() >= tab['ready_at']:
+                    driver.switch_to.window(tab['handle'])
+                    article = tab['article']
+                    tab['article'] = None
+                    if self.mark_article_complete(driver):
+                        on_completed(article)
+                    else:
+                        self.unclaim(article)
+                        print(f"⚠️  Article read but could not mark as complete: {article.get('title', 'Unknown')}")
+                    progressed = True
+
+            reading = [tab['ready_at'] for tab in tabs if tab['article'] is not None]
+            if not reading and article_queue.empty():
+                break
+            if not progressed and reading:
+                # Every tab is either reading or has nothing left to load
+                time.sleep(max(0, min(reading) - time.time()))
+
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+    def record_completed(self, completed_csv, article, lock, stats):
+        with lock:
+            self.add_to_completed(completed_csv, article)
+            stats['completed'] += 1
+        print(f"✅ Article completed and tracked: {article.get('title', 'Unknown')}")
+
     def add_to_completed(self, completed_csv, article):
-        """Add completed article to tracking CSV"""
+        """Add completed article to the progress store and tracking CSV"""
+        with span('record completed'):
+            self._add_to_completed(completed_csv, article)
+
+    def _add_to_completed(self, completed_csv, article):
         try:
-            file_exists = os.path.exists(completed_csv)
-            with open(completed_csv, 'a', newline='', encoding='utf-8') as f:
-                fieldnames = ['title', 'url', 'type', 'completed_at']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-
-                if not file_exists:
-                    writer.writeheader()
-
-                writer.writerow({
-                    'title': article.get('title', 'Unknown'),
-                    'url': article['url'],
-                    'type': article.get('type', 'article'),
-                    'completed_at': time.strftime('%Y-%m-%d %H:%M:%S')
-                })
+            completed_at = self.store.mark_completed(article['url'], article.get('title'), article.get('type', 'article'))
+            writer = self.completed_writers.get(completed_csv)
+            if writer is None:
+                writer = BatchedCsvWriter(completed_csv, COMPLETED_FIELDNAMES, batch_size=20)
+                self.completed_writers[completed_csv] = writer
+
+            writer.write({
+                'title': article.get('title', 'Unknown'),
+                'url': article['url'],
+                'type': article.get('type', 'article'),
+                'completed_at': completed_at
+            })
+            if self.leases:
+                # The .done marker stops other workers reclaiming the article, so the row must be in the shard first
+                writer.checkpoint()
+                self.leases.complete(canonical_key(article['url']))
         except Exception as e:
             print(f"Error tracking completed article: {e}")
 
-    def mark_article_complete(self):
+    def mark_article_complete(self, driver=None):
+        with span('mark complete'):
+            return self._mark_article_complete(driver or self.driver)
+
+    def _mark_article_complete(self, driver):
         try:
             js_script = """
+            const clickAndReturn = (el) => {
+                el.setAttribute('data-state-before', [el.textContent, el.disabled, el.className].join('|'));
+                el.click();
+                return el;
+            };
+
             const buttons = document.querySelectorAll('button, [role="button"], .btn, .button, input[type="button"], input[type="submit"]');
             for (let btn of buttons) {
                 const text = (btn.textContent || btn.innerText || btn.value || '').toLowerCase().trim();
                 if (text.includes('mark as read') || text.includes('mark as completed') || text.includes('complete') || text.includes('read')) {
-                    btn.click();
-                    return true;
+                    return clickAndReturn(btn);
                 }
             }
 
             const completeElements = document.querySelectorAll('[data-action*="complete"], [data-action*="read"], .complete, .mark-complete, .mark-read, .read');
             for (let elem of completeElements) {
                 if (elem.tagName.toLowerCase() === 'button' || elem.onclick || elem.getAttribute('role') === 'button' || elem.type === 'button' || elem.type === 'submit') {
-                    elem.click();
-                    return true;
+                    return clickAndReturn(elem);
                 }
             }
 
             return false;
             """
 
-            result = self.driver.execute_script(js_script)
-            if result:
+            clicked = driver.execute_script(js_script)
+            if clicked:
                 print("Marked as read")
-                time.sleep(2)
+                wait_until(driver, button_state_changed(clicked), 2, 'mark complete')
                 return True
             else:
                 print("Could not mark as read")
@@ -231,10 +451,78 @@ class ArticleAutomater:
             return False
 
     def close(self):
+        for writer in self.completed_writers.values():
+            writer.close()
+        self.completed_writers = {}
         if self.driver:
             self.driver.quit()
 
-def main():
+def article_url(article):
+    url = article['url']
+    if not url.startswith('http'):
+        url = f"{BASE_URL}{url}"
+    return url
+
+def run_study_session(accelerator, items_csv, completed_csv, concurrency, item_timeout):
+    while True:
+        accelerator.deferred = []
+        if TABS_PER_BROWSER > 1 or BROWSERS_PER_HOST > 1:
+            accelerator.study_articles_tabs(items_csv, completed_csv)
+        elif concurrency > 1:
+            asyncio.run(accelerator.study_articles_async(items_csv, completed_csv, concurrency, item_timeout))
+        else:
+            accelerator.study_articles_session(items_csv, completed_csv)
+
+        # Sharded run: go again once the articles other workers hold are done or their leases lapse
+        waiting = [key for key in accelerator.deferred if not accelerator.leases.is_done(key)]
+        if not waiting:
+            return
+        wait = min(LEASE_POLL, max(1.0, accelerator.leases.expires_in(waiting)))
+        print(f"{len(waiting)} articles are leased to other workers, checking again in {wait:.0f}s")
+        time.sleep(wait)
+
+def merge_completed_shards(shard_dir, completed_csv, progress_db):
+    """Fold every worker's completed_articles shard into completed_articles.csv and the progress store.
+
+    An article completed by several workers keeps its earliest completion;
+    rows go out ordered by completed_at, then URL. The merged shards, their
+    stores and the article leases are removed afterwards.
+    """
+    shard_paths = sorted(glob.glob(os.path.join(shard_dir, 'completed_articles.*.csv')))
+    if not shard_paths:
+        print(f"No completed_articles shards in {shard_dir}")
+        return []
+
+    rows = [row for path in shard_paths for row in read_item_rows(path) if row.get('url')]
+    rows.sort(key=lambda row: (row.get('completed_at') or '', row['url']))
+
+    store = ProgressStore(progress_db)
+    store.import_completed_csv(completed_csv)
+    merged = []
+    seen = set()
+    for row in rows:
+        key = canonical_key(row['url'])
+        if key in seen or store.is_completed(row['url']):
+            continue
+        seen.add(key)
+        store.mark_completed(row['url'], row.get('title'), row.get('type') or 'article', row.get('completed_at'))
+        merged.append(row)
+
+    with open(completed_csv, 'a', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=COMPLETED_FIELDNAMES, extrasaction='ignore')
+        if csvfile.tell() == 0:
+            writer.writeheader()
+        writer.writerows(merged)
+        csvfile.flush()
+        os.fsync(csvfile.fileno())
+
+    for path in shard_paths + glob.glob(os.path.join(shard_dir, 'progress.study.*.db*')):
+        os.remove(path)
+    shutil.rmtree(os.path.join(shard_dir, 'leases', 'articles'), ignore_errors=True)
+    print(f"Merged {len(merged)} completed articles from {len(shard_paths)} shards into {completed_csv}")
+    return merged
+
+def main(concurrency=1, item_timeout=60):
     base_dir = os.path.dirname(os.path.abspath(__file__))
     cookies_file = os.path.join(base_dir, 'cookies.json')
     items_csv = os.path.join(base_dir, 'module_items.csv')
@@ -248,13 +536,24 @@ def main():
         print("No module_items.csv")
         return
 
-    accelerator = ArticleAutomater(cookies_file)
+    leases = None
+    if SHARD_DIR:
+        # Each worker keeps a private store and CSV shard; the shared CSVs are only read
+        shard_name = WORKER_ID or worker_id()
+        leases = LeaseStore(os.path.join(SHARD_DIR, 'leases', 'articles'), LEASE_TTL, shard_name).start()
+        shard_db = os.path.join(SHARD_DIR, f'progress.study.{shard_name}.db')
+        accelerator = ArticleAutomater(cookies_file, shard_db, leases)
+        accelerator.store.import_completed_csv(completed_csv)
+        completed_csv = os.path.join(SHARD_DIR, f'completed_articles.{shard_name}.csv')
+        print(f"Worker {shard_name}: claiming articles under {SHARD_DIR}, writing {completed_csv}")
+    else:
+        accelerator = ArticleAutomater(cookies_file, os.path.join(base_dir, 'progress.db'))
 
     print("Article Automater Starting...")
 
     if accelerator.setup_driver(headless=True):
         if accelerator.test_authentication():
-            accelerator.study_articles_session(items_csv, completed_csv)
+            run_study_session(accelerator, items_csv, completed_csv, concurrency, item_timeout)
         else:
             print("Authentication failed. Attempting to refresh cookies...")
             accelerator.close()
@@ -262,13 +561,54 @@ def main():
             if accelerator.refresh_authentication():
                 accelerator.close()
                 accelerator.setup_driver(headless=True)
-                accelerator.study_articles_session(items_csv, completed_csv)
+                run_study_session(accelerator, items_csv, completed_csv, concurrency, item_timeout)
             else:
                 print("Re-authentication failed")
     else:
         print("Setup failed")
 
     accelerator.close()
+    if leases:
+        leases.close()
+        print(f"Run 'python article_automater.py merge --shard-dir {SHARD_DIR}' once every worker has finished")
+    report_waits()
+    report_pages()
+    report_spans('study_profile.json')
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Read and mark pending articles from module_items.csv')
+    parser.add_argument('command', nargs='?', choices=['study', 'merge'], default='study',
+                        help="'merge' folds the --shard-dir outputs of a sharded run into completed_articles.csv")
+    parser.add_argument('--concurrency', type=int, default=1, help='Articles kept in flight at once')
+    parser.add_argument('--timeout', type=int, default=60, help='Per-article timeout in seconds')
+    parser.add_argument('--tabs-per-browser', type=int, default=TABS_PER_BROWSER,
+                        help='Window handles per Chrome instance, scheduled round-robin')
+    parser.add_argument('--browser-profile', choices=PROFILES, default=BROWSER_PROFILE,
+                        help='Chrome profile for headless sessions; page weight and load time are reported per page')
+    parser.add_argument('--browsers-per-host', type=int, default=BROWSERS_PER_HOST,
+                        help='Chrome instances to run the tab scheduler in')
+    parser.add_argument('--shard-dir',
+                        help='Shared directory for a sharded run: articles are claimed through leases there and '
+                             'each process writes its own completed_articles shard')
+    parser.add_argument('--worker-id', help='Name of this process in a sharded run (default: host-pid-random)')
+    parser.add_argument('--lease-ttl', type=float, default=LEASE_TTL,
+                        help="Seconds before a silent worker's article leases can be reclaimed")
+    args = parser.parse_args()
+    TABS_PER_BROWSER = args.tabs_per_browser
+    BROWSERS_PER_HOST = args.browsers_per_host
+    BROWSER_PROFILE = args.browser_profile
+    SHARD_DIR = args.shard_dir
+    WORKER_ID = args.worker_id
+    LEASE_TTL = args.lease_ttl
+    if args.command == 'merge':
+        if not SHARD_DIR:
+            parser.error('merge needs --shard-dir')
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        merge_completed_shards(SHARD_DIR, os.path.join(base_dir, 'completed_articles.csv'),
+                               os.path.join(base_dir, 'progress.db'))
+    else:
+        install_queued_output()
+        try:
+            main(concurrency=args.concurrency, item_timeout=args.timeout)
+        finally:
+            stop_queued_output()
\ No newline at end of file
@@ -0,0 +1,443 @@
+import os
+import io
+import sys
+import csv
+import json
+import time
+import base64
+import random
+import argparse
+import tempfile
+import threading
+import contextlib
+import subprocess
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+import session
+import course_scanner
+import article_automater
+from driver_pool import run_driver_pool
+from extraction import parse_track_cards, track_fields
+from fetch_backend import FallbackFetcher, HttpFetcher
+
+COURSE_PATH = '/batch/dsa-jiit'
+CATEGORIES = ['Programming Language', 'Data Structures', 'Algorithms', 'Core Subjects', 'Practice']
+TABS = ['CPP', 'Java', 'Python']
+# module_items.csv averages about six items per track
+ITEMS_PER_TRACK = (3, 10)
+
+OVERVIEW_SCRIPT = """
+<script>
+// Mimic the live page: only the open category's active tab has cards in the DOM
+document.addEventListener('DOMContentLoaded', () => {
+  const panels = {};
+  document.querySelectorAll('.bench_panel').forEach(p => { panels[p.id] = p; p.remove(); });
+  const show = (section, tabIdx) => {
+    section.querySelectorAll('.bench_slot').forEach(s => s.replaceChildren());
+    section.querySelectorAll('.menu .item').forEach((t, i) => t.classList.toggle('active', i === tabIdx));
+    section.querySelector('.bench_slot').appendChild(panels[section.id + '-' + tabIdx]);
+  };
+  document.querySelectorAll('.batch_individual_tab__type___wbkY').forEach(section => {
+    const header = section.querySelector('.batch_category_header___igBF');
+    header.addEventListener('click', () => {
+      document.querySelectorAll('.batch_individual_tab__type___wbkY').forEach(other => {
+        other.querySelector('.batch_category_header___igBF').classList.remove('batch_open__FkoHN');
+        other.querySelector('.bench_slot').replaceChildren();
+      });
+      setTimeout(() => { header.classList.add('batch_open__FkoHN'); show(section, 0); }, 50);
+    });
+    section.querySelectorAll('.menu .item').forEach((tab, i) => tab.addEventListener('click', () => {
+      section.querySelector('.bench_slot').replaceChildren();
+      setTimeout(() => show(section, i), 50);
+    }));
+  });
+});
+</script>
+"""
+
+TRACK_SCRIPT = """
+<script>
+document.addEventListener('DOMContentLoaded', () => {
+  const items = Array.from(document.querySelectorAll('.sidebar_item__khyNp'));
+  const list = document.getElementById('bench_items');
+  document.querySelectorAll('.sidebar_tabs__JmBlR').forEach(tab => tab.addEventListener('click', () => {
+    document.querySelectorAll('.sidebar_tabs__JmBlR').forEach(t => t.classList.remove('active'));
+    list.replaceChildren();
+    setTimeout(() => {
+      tab.classList.add('active');
+      items.filter(i => tab.dataset.kind === 'all' || i.dataset.kind === tab.dataset.kind)
+           .forEach(i => list.appendChild(i));
+    }, 50);
+  }));
+});
+</script>
+"""
+
+ARTICLE_SCRIPT = """
+<script>
+document.addEventListener('DOMContentLoaded', () => {
+  const button = document.getElementById('bench_mark');
+  button.addEventListener('click', () => { button.textContent = 'Marked as Read'; button.disabled = true; });
+});
+</script>
+"""
+
+
+def encode_id(number):
+    return base64.b64encode(str(number).encode()).decode()
+
+
+class FakeCourse:
+    """Deterministic synthetic course: categories, tabs, tracks and their items"""
+
+    def __init__(self, num_tracks, seed=0):
+        rng = random.Random(seed)
+        self.tracks = []
+        self.items = {}
+        next_id = 1000
+        for number in range(num_tracks):
+            slug = f"bench-track-{number}"
+            videos = rng.randint(*ITEMS_PER_TRACK) // 2 + 1
+            articles = rng.randint(*ITEMS_PER_TRACK) // 2
+            items = []
+            for kind, count in (('video', videos), ('article', articles)):
+                for _ in range(count):
+                    items.append({'kind': kind, 'id': next_id, 'title': f"{kind.title()} {next_id} of {slug}"})
+                    next_id += 1
+            rng.shuffle(items)
+            self.items[slug] = items
+            self.tracks.append({'slug': slug, 'title': f"Bench Track {number}", 'videos': videos,
+                                'articles': articles, 'category': number % len(CATEGORIES),
+                                'tab': (number // len(CATEGORIES)) % len(TABS)})
+
+    def overview_html(self):
+        sections = []
+        for category_idx, category in enumerate(CATEGORIES):
+            section_id = f"bench-section-{category_idx}"
+            panels = []
+            for tab_idx in range(len(TABS)):
+                cards = ''.join(
+                    f'<a href="{COURSE_PATH}/track/{track["slug"]}"><div class="batch_item__ndA6j">'
+                    f'<p class="batch_title__XImuz">{escape(track["title"])}</p>'
+                    f'<div class="batch_content_meta__8RbQN"><p>{track["videos"]} Videos</p>'
+                    f'<p>{track["articles"]} Articles</p></div></div></a>'
+                    for track in self.tracks if track['category'] == category_idx and track['tab'] == tab_idx)
+                panels.append(f'<div class="bench_panel" id="{section_id}-{tab_idx}">{cards}</div>')
+            tabs = ''.join(f'<a class="item">{tab}</a>' for tab in TABS)
+            sections.append(
+                f'<div class="batch_individual_tab__type___wbkY" id="{section_id}">'
+                f'<div class="batch_category_header___igBF"><h3>{category}</h3></div>'
+                f'<div class="ui pointing secondary menu">{tabs}</div>'
+                f'<div class="bench_slot"></div>{"".join(panels)}</div>')
+        return f"<html><head>{OVERVIEW_SCRIPT}</head><body>{''.join(sections)}</body></html>"
+
+    def track_html(self, slug):
+        items = self.items.get(slug)
+        if items is None:
+            return None
+        links = ''.join(
+            f'<a class="sidebar_item__khyNp" data-kind="{item["kind"]}" '
+            f'href="{COURSE_PATH}/track/{slug}/{item["kind"]}/{encode_id(item["id"])}">'
+            f'<p>{escape(item["title"])}</p><div class="sidebar_meta__9J4r4">'
+            f'{"Duration: 7 min" if item["kind"] == "video" else "Last Updated: 01 Jan, 2024"}</div></a>'
+            for item in items)
+        videos = sum(1 for item in items if item['kind'] == 'video')
+        tabs = (f'<div class="sidebar_tabs__JmBlR active" data-kind="all"><p>All ({len(items)})</p></div>'
+                f'<div class="sidebar_tabs__JmBlR" data-kind="video"><p>Videos ({videos})</p></div>'
+                f'<div class="sidebar_tabs__JmBlR" data-kind="article"><p>Articles ({len(items) - videos})</p></div>')
+        return f"<html><head>{TRACK_SCRIPT}</head><body>{tabs}<div id=\"bench_items\">{links}</div></body></html>"
+
+    def article_html(self, path):
+        return (f"<html><head>{ARTICLE_SCRIPT}</head><body><h1>{escape(path.rsplit('/', 1)[-1])}</h1>"
+                f"<p>{'Lorem ipsum dolor sit amet. ' * 200}</p>"
+                f"<button id=\"bench_mark\">Mark as Read</button></body></html>")
+
+
+def start_fake_site(course, latency=0.0, port=0):
+    """Serve a FakeCourse on localhost with `latency` seconds added to every response; returns (server, base_url)"""
+    overview = course.overview_html().encode('utf-8')
+
+    class FakeSiteHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            path = urlsplit(self.path).path.rstrip('/')
+            parts = path.split('/')
+            if path == COURSE_PATH:
+                body = overview
+            elif len(parts) == 5 and path.startswith(f"{COURSE_PATH}/track/"):
+                page = course.track_html(parts[4])
+                body = page.encode('utf-8') if page else None
+            elif len(parts) == 7 and parts[5] in ('video', 'article'):
+                body = course.article_html(path).encode('utf-8')
+            elif path == '':
+                body = b'<html><body>bench</body></html>'
+            else:
+                body = None
+
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeSiteHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _proc_tree_rss_kb(root_pid):
+    """RSS of root_pid and all its descendants from /proc, in KiB"""
+    page_kb = os.sysconf('SC_PAGE_SIZE') // 1024
+    children = {}
+    rss = {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat') as f:
+                # The command name may contain spaces; ppid is the second field after it
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            with open(f'/proc/{name}/statm') as f:
+                rss[int(name)] = int(f.read().split()[1]) * page_kb
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        total += rss.get(pid, 0)
+        pending.extend(children.get(pid, []))
+    return total
+
+
+def tree_rss_kb(pid=None):
+    """RSS of a process plus every descendant (chromedriver, Chrome, its renderers) in KiB.
+
+    Uses psutil when installed, else /proc; None where neither is available.
+    """
+    pid = pid or os.getpid()
+    if psutil:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass  # exited between listing and sampling
+        return total // 1024
+    if os.path.isdir('/proc'):
+        return _proc_tree_rss_kb(pid)
+    return None
+
+
+class PeakRss:
+    """Sample tree_rss_kb() every `interval` seconds while the block runs and keep the peak.
+
+    Chrome's processes come and go during a run, so the peak has to be
+    sampled while they are alive rather than read from rusage afterwards.
+    """
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.peak_kb = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def sample(self):
+        rss = tree_rss_kb()
+        if rss is not None:
+            self.peak_kb = max(self.peak_kb or 0, rss)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.sample()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        self.sample()
+
+
+def rate(count, seconds, per=1.0):
+    return round(count / seconds * per, 2) if seconds else None
+
+
+def bench_overview(backend, course_url, cookies_file):
+    start = time.time()
+    if backend == 'http':
+        http = HttpFetcher(cookies_file)
+        page_html = http.fetch(course_url)
+        http.close()
+        tracks = [track_fields(card) for card in parse_track_cards(page_html or '', course_url) if card['url']]
+    else:
+        driver = course_scanner.setup_driver(headless=True)
+        try:
+            tracks = course_scanner.scrape_course_tracks(driver, course_url, cookies_file)
+        finally:
+            driver.quit()
+    seconds = time.time() - start
+    return tracks, {'seconds': round(seconds, 3), 'tracks': len(tracks),
+                    'tracks_per_min': rate(len(tracks), seconds, 60)}
+
+
+def bench_modules(backend, tracks, cookies_file, workers):
+    items = []
+    lock = threading.Lock()
+
+    def scrape(worker, track):
+        if backend == 'http':
+            track_items = course_scanner.scrape_module_items_http(worker, track['url'], cookies_file)
+        else:
+            track_items = course_scanner.scrape_module_items(worker, track['url'], cookies_file)
+        with lock:
+            items.extend(track_items)
+
+    if backend == 'http':
+        http = HttpFetcher(cookies_file, pool_size=workers)
+        worker_factory = lambda: FallbackFetcher(http, course_scanner.setup_driver)
+    else:
+        http = None
+        worker_factory = course_scanner.setup_driver
+
+    start = time.time()
+    run_driver_pool(tracks, scrape, worker_factory, num_workers=workers)
+    seconds = time.time() - start
+    if http:
+        http.close()
+    return items, {'seconds': round(seconds, 3), 'tracks': len(tracks), 'items': len(items),
+                   'tracks_per_min': rate(len(tracks), seconds, 60), 'items_per_s': rate(len(items), seconds)}
+
+
+def bench_articles(items, cookies_file, workdir, limit):
+    articles = [item for item in items if item['type'] == 'article'][:limit]
+    items_csv = os.path.join(workdir, 'bench_items.csv')
+    completed_csv = os.path.join(workdir, 'bench_completed.csv')
+    with open(items_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=course_scanner.ITEM_FIELDNAMES, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(articles)
+
+    article_automater.READING_TIME_SECONDS = 0
+    automater = article_automater.ArticleAutomater(cookies_file, os.path.join(workdir, 'bench_articles.db'))
+    start = time.time()
+    try:
+        automater.setup_driver(headless=True)
+        automater.study_articles_session(items_csv, completed_csv)
+    finally:
+        automater.close()
+    seconds = time.time() - start
+    completed = sum(count for (_, status), count in automater.store.counts().items() if status == 'completed')
+    return {'seconds': round(seconds, 3), 'articles': len(articles), 'completed': completed,
+            'items_per_s': rate(completed, seconds)}
+
+
+def run_benchmark(num_tracks, backend='http', latency=0.0, workers=5, articles=50, verbose=False):
+    """One end-to-end run against a fresh fake site; returns the result dict"""
+    course = FakeCourse(num_tracks)
+    server, base_url = start_fake_site(course, latency)
+    workdir = tempfile.mkdtemp(prefix='bench-')
+    cookies_file = os.path.join(workdir, 'cookies.json')
+    with open(cookies_file, 'w') as f:
+        json.dump([], f)
+
+    # Seeding cookies opens BASE_URL first; keep it on the fake site
+    real_base_url = session.BASE_URL
+    session.BASE_URL = base_url
+    result = {'tracks': num_tracks, 'backend': backend, 'latency_ms': round(latency * 1000), 'workers': workers}
+    output = sys.stdout if verbose else io.StringIO()
+    rss = PeakRss()
+    try:
+        with rss, contextlib.redirect_stdout(output):
+            tracks, result['overview'] = bench_overview(backend, base_url + COURSE_PATH, cookies_file)
+            items, result['modules'] = bench_modules(backend, tracks, cookies_file, workers)
+            if backend == 'browser' and articles:
+                result['articles'] = bench_articles(items, cookies_file, workdir, articles)
+    finally:
+        session.BASE_URL = real_base_url
+        server.shutdown()
+        server.server_close()
+
+    result['peak_rss_kb'] = rss.peak_kb
+    return result
+
+
+def git_version():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path):
+    """Print the change in each throughput metric against an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = {(run['tracks'], run['backend'], run['latency_ms']): run for run in json.load(f)['runs']}
+    for run in results['runs']:
+        old = baseline.get((run['tracks'], run['backend'], run['latency_ms']))
+        if not old:
+            continue
+        for phase, metric in (('overview', 'tracks_per_min'), ('modules', 'tracks_per_min'),
+                              ('modules', 'items_per_s'), ('articles', 'items_per_s')):
+            before = old.get(phase, {}).get(metric)
+            after = run.get(phase, {}).get(metric)
+            if before and after:
+                print(f"  {run['tracks']} tracks {phase} {metric}: {before} -> {after} ({(after / before - 1) * 100:+.1f}%)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the scrapers against a local fake course site')
+    parser.add_argument('--tracks', type=int, nargs='+', default=[230, 1000, 10000],
+                        help='Course sizes to run, smallest first')
+    parser.add_argument('--backend', choices=['http', 'browser'], default='http',
+                        help="'browser' drives Chrome through every phase; 'http' needs no Chrome")
+    parser.add_argument('--latency-ms', type=float, default=0, help='Artificial latency added to every response')
+    parser.add_argument('--workers', type=int, default=5)
+    parser.add_argument('--articles', type=int, default=50, help='Articles to study in the browser run')
+    parser.add_argument('--output', help='Results file (default benchmarks/bench-<time>.json)')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--verbose', action='store_true', help="Show the scrapers' own output")
+    args = parser.parse_args()
+
+    results = {'version': git_version(), 'started': time.strftime('%Y-%m-%d %H:%M:%S'), 'runs': []}
+    for num_tracks in sorted(args.tracks):
+        print(f"Benchmarking {num_tracks} tracks ({args.backend}, {args.latency_ms:g} ms latency)...")
+        run = run_benchmark(num_tracks, args.backend, args.latency_ms / 1000, args.workers, args.articles, args.verbose)
+        print(json.dumps(run))
+        results['runs'].append(run)
+
+    output = args.output or os.path.join('benchmarks', f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+    if args.baseline:
+        compare(results, args.baseline)
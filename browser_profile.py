@@ -0,0 +1,123 @@
+import os
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from network_capture import enable_performance_logging
+
+# The scrapers only read DOM text and hrefs, so none of these need to load
+BLOCKED_RESOURCES = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+]
+BLOCKED_HOSTS = [
+    '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*', '*googlesyndication.com*',
+    '*adservice.google.com*', '*facebook.net*', '*facebook.com/tr*', '*hotjar.com*', '*clarity.ms*',
+    '*youtube.com*', '*ytimg.com*', '*vimeo.com*', '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+]
+
+PROFILES = ('lean', 'full')
+
+PAGE_METRICS_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    bytes: (nav ? nav.transferSize : 0) + resources.reduce((total, r) => total + (r.transferSize || 0), 0),
+    requests: resources.length + 1,
+    load_ms: nav ? Math.round((nav.domContentLoadedEventEnd || nav.responseEnd) - nav.startTime) : null
+};
+"""
+
+_page_stats = []
+
+
+def chrome_options(headless=True, profile='lean', capture_network=False):
+    options = Options()
+    if headless:
+        options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+
+    if profile == 'lean':
+        options.add_argument('--window-size=1280,800')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+        # Return from get() at DOMContentLoaded; callers already wait for the elements they need
+        options.page_load_strategy = 'eager'
+    else:
+        options.add_argument('--window-size=1920,1080')
+
+    if capture_network:
+        enable_performance_logging(options)
+    return options
+
+
+def block_resources(driver):
+    """Drop image, media, font and third-party requests at the network layer"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_RESOURCES + BLOCKED_HOSTS})
+    except Exception as e:
+        print(f"Resource blocking unavailable: {e}")
+
+
+def create_chrome(headless=True, profile='lean', capture_network=False):
+    """Start Chrome with the given profile, or return None if chromedriver is unavailable"""
+    chromedriver_path = 'chromedriver.exe'
+    if os.path.exists(chromedriver_path):
+        service = Service(chromedriver_path)
+    else:
+        try:
+            service = Service(ChromeDriverManager().install())
+        except Exception as e:
+            print(f"ChromeDriver error: {e}")
+            return None
+
+    driver = webdriver.Chrome(service=service, options=chrome_options(headless, profile, capture_network))
+    driver._profile = profile
+    if profile == 'lean':
+        block_resources(driver)
+    return driver
+
+
+def record_page(driver, label):
+    """Note bytes transferred and load time of the page the driver just loaded.
+
+    Cross-origin resources without Timing-Allow-Origin report a transfer size
+    of 0, so the byte count is a lower bound.
+    """
+    try:
+        metrics = driver.execute_script(PAGE_METRICS_SCRIPT)
+    except Exception:
+        return None
+    if not metrics:
+        return None
+    metrics.update(label=label, profile=getattr(driver, '_profile', 'full'), time=time.time())
+    _page_stats.append(metrics)
+    print(f"  Page {label}: {metrics['bytes'] / 1024:.0f} KiB in {metrics['requests']} requests, "
+          f"{metrics['load_ms']} ms ({metrics['profile']} profile)")
+    return metrics
+
+
+def report_pages():
+    """Print per-profile page weight and load time for the pages recorded so far"""
+    by_profile = {}
+    for stat in _page_stats:
+        by_profile.setdefault(stat['profile'], []).append(stat)
+
+    for profile, stats in sorted(by_profile.items()):
+        load_times = sorted(stat['load_ms'] for stat in stats if stat['load_ms'] is not None)
+        total_bytes = sum(stat['bytes'] for stat in stats)
+        median = load_times[len(load_times) // 2] if load_times else 0
+        print(f"{profile} profile: {len(stats)} pages, {total_bytes / 1024 / max(len(stats), 1):.0f} KiB/page, "
+              f"{sum(stat['requests'] for stat in stats) / max(len(stats), 1):.0f} requests/page, "
+              f"median load {median} ms")
@@ -0,0 +1,158 @@
+import os
+import time
+import random
+import threading
+
+import session
+
+
+def host_pressure():
+    """(load per CPU, fraction of memory available); None for whatever this OS does not expose"""
+    try:
+        load = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        load = None
+
+    available = None
+    try:
+        meminfo = {}
+        with open('/proc/meminfo') as f:
+            for line in f:
+                name, value = line.split(':', 1)
+                meminfo[name] = int(value.split()[0])
+        available = meminfo['MemAvailable'] / meminfo['MemTotal']
+    except (OSError, KeyError, ValueError, ZeroDivisionError):
+        pass
+    return load, available
+
+
+class AdaptiveLimiter:
+    """AIMD limit on how many pool workers may run a task at once.
+
+    Every `window` finished tasks the limit is re-evaluated: it is halved
+    (never below floor) when tasks fail, sessions start hitting login pages,
+    median time of successful tasks climbs past `slowdown` times the baseline
+    (the best window seen since the last slowdown), or the host runs short
+    of CPU or memory. Otherwise it grows by one up to ceiling.
+    """
+
+    def __init__(self, floor=1, ceiling=8, initial=None, window=10, max_error_rate=0.2, max_auth_failures=1,
+                 slowdown=2.0, max_load=0.9, min_memory=0.15):
+        self.floor = floor
+        self.ceiling = max(floor, ceiling)
+        self.limit = min(self.ceiling, max(floor, initial or floor))
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.max_auth_failures = max_auth_failures
+        self.slowdown = slowdown
+        self.max_load = max_load
+        self.min_memory = min_memory
+
+        self.active = 0
+        self.samples = []
+        self.best_latency = None
+        self.auth_failures_seen = session.auth_failures()
+        self.history = [(time.time(), self.limit, 'start')]
+        self.condition = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """Take a slot; False if none freed up within timeout"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.active < self.limit, timeout):
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def record(self, latency, ok=True):
+        with self.condition:
+            self.samples.append((latency, ok))
+            if len(self.samples) >= self.window:
+                self._adjust()
+                self.samples = []
+                self.condition.notify_all()
+
+    def _adjust(self):
+        # Failed tasks often end early (login page, missing selector), so only successes set the latency baseline
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        median = latencies[len(latencies) // 2] if latencies else None
+        error_rate = sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+        auth_failures = session.auth_failures() - self.auth_failures_seen
+        self.auth_failures_seen += auth_failures
+        load, memory = host_pressure()
+        slowed = median is not None and bool(self.best_latency) and median > self.best_latency * self.slowdown
+
+        if auth_failures >= self.max_auth_failures:
+            reason = f"{auth_failures} auth failures"
+        elif error_rate > self.max_error_rate:
+            reason = f"{error_rate:.0%} errors"
+        elif slowed:
+            reason = f"median {median:.1f}s vs baseline {self.best_latency:.1f}s"
+        elif load is not None and load > self.max_load:
+            reason = f"load {load:.2f} per CPU"
+        elif memory is not None and memory < self.min_memory:
+            reason = f"{memory:.0%} memory free"
+        else:
+            reason = None
+
+        if median is not None and (self.best_latency is None or median < self.best_latency):
+            self.best_latency = median
+        elif slowed:
+            # Back off once per slowdown, then judge later windows against the new normal;
+            # otherwise one unusually quick window pins the limit at the floor for good
+            self.best_latency = median
+
+        if reason:
+            new_limit = max(self.floor, self.limit // 2)
+        else:
+            new_limit = min(self.ceiling, self.limit + 1)
+            reason = 'healthy'
+        if new_limit != self.limit:
+            print(f"Concurrency {self.limit} -> {new_limit} ({reason})")
+            self.limit = new_limit
+            self.history.append((time.time(), new_limit, reason))
+
+
+def backoff_delay(attempt, base=2.0, cap=60.0):
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Pause every worker when auth failures against the host spike.
+
+    `threshold` failures within `window` seconds open the breaker for
+    `cooldown` seconds; wait() blocks callers until it closes again.
+    """
+
+    def __init__(self, threshold=3, window=60.0, cooldown=120.0):
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.failures = []
+        self.open_until = 0.0
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def record_failure(self):
+        with self.lock:
+            now = time.time()
+            self.failures = [t for t in self.failures if now - t < self.window] + [now]
+            if len(self.failures) >= self.threshold and now >= self.open_until:
+                self.open_until = now + self.cooldown
+                self.failures = []
+                self.trips += 1
+                print(f"Circuit open: {self.threshold} auth failures within {self.window:.0f}s, "
+                      f"pausing all workers for {self.cooldown:.0f}s")
+
+    def wait(self):
+        while True:
+            with self.lock:
+                remaining = self.open_until - time.time()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 1.0))
@@ -1,82 +1,86 @@
 import os
+import re
 import csv
+import glob
+import shutil
+import hashlib
+import argparse
 import time
-import json
 import threading
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-
-def setup_driver(headless=True):
-    options = Options()
-    if headless:
-        options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--window-size=1920,1080')
-
-    chromedriver_path = 'chromedriver.exe'
-    if os.path.exists(chromedriver_path):
-        service = Service(chromedriver_path)
-    else:
-        try:
-            service = Service(ChromeDriverManager().install())
-        except Exception as e:
-            print(f"ChromeDriver error: {e}")
-            return None
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
-
-def load_cookies(driver, cookies_file='cookies.json'):
-    try:
-        with open(cookies_file, 'r') as f:
-            cookies = json.load(f)
-
-        driver.get("https://www.geeksforgeeks.org")
-        time.sleep(2)
 
-        for cookie in cookies:
-            try:
-                if 'expiry' in cookie and cookie['expiry']:
-                    cookie['expiry'] = int(cookie['expiry'])
-
-                driver.add_cookie(cookie)
-            except Exception as e:
-                pass
-
-        print("Cookies loaded")
-        return True
-
-    except Exception as e:
-        print(f"Cookie error: {e}")
-        return False
+from browser_profile import PROFILES, create_chrome, report_pages
+from concurrency import AdaptiveLimiter, CircuitBreaker, backoff_delay
+from csv_writer import BatchedCsvWriter
+from driver_pool import SKIPPED, Requeue, run_driver_pool
+from extraction import (detect_item_type, parse_sidebar_items, parse_sidebar_tab_labels, parse_track_cards,
+                        sidebar_item_fields, track_fields, url_kind_segment)
+from fetch_backend import FallbackFetcher, HttpFetcher, needs_browser
+from leases import LeaseStore, worker_id
+from network_capture import collect_json_responses, drain_performance_log, items_from_responses, save_recordings
+from progress_store import ProgressStore, track_slug_from_url
+from readiness import has_class, report_waits, wait_for_document, wait_for_page, wait_for_tab, wait_until
+from session import BASE_URL, get_authenticated
+from snapshot_store import SnapshotStore
+from timing import install_queued_output, report_spans, span, stop_queued_output, track_span
+from url_canon import canonical_key, read_item_rows
+
+# 'bulk' pulls each view's items with one execute_script call,
+# 'html' grabs page_source and parses it with the shared lxml engine,
+# 'element' uses the original per-element WebDriver lookups,
+# 'json' builds module items from captured XHR responses (DOM as fallback)
+EXTRACTION_MODE = 'bulk'
+
+# 'browser' drives Chrome for every track, 'http' fetches track pages with the
+# saved cookies and only falls back to Chrome for pages that need JS
+FETCH_BACKEND = 'browser'
+
+# 'lean' blocks images, media, fonts and third-party hosts; 'full' is a stock 1920x1080 Chrome
+BROWSER_PROFILE = 'lean'
+
+# Where 'json' mode saves captured responses for replay_server.py
+RECORDINGS_DIR = 'recordings'
+
+COURSE_URL = f"{BASE_URL}/batch/dsa-jiit"
+
+# SQLite progress store shared with the article automater
+PROGRESS_DB = 'progress.db'
+
+# SnapshotStore that receives every fetched page_source, or None to disable
+SNAPSHOT_STORE = None
+
+TRACK_FIELDNAMES = ['title', 'url', 'videos', 'articles', 'problems', 'mcqs', 'category', 'tab']
+ITEM_FIELDNAMES = ['type', 'title', 'url', 'meta']
+TAB_TYPES = {'videos': 'video', 'articles': 'article', 'all': None}
+
+# How each track's items were last scraped ('all', 'per-type', 'json', 'http', ...), keyed by track URL
+TRACK_STRATEGIES = {}
+
+# Why the last scrape of a track came back empty ('auth' or 'selector-miss'), keyed by track URL
+TRACK_FAILURES = {}
+
+# Attempts per track before it is left for the next run; failed tracks are
+# requeued behind the rest of the work with exponential backoff and jitter
+MAX_ATTEMPTS = 3
+
+# Sharded runs: each process claims tracks through leases under SHARD_DIR and
+# writes its items to SHARD_DIR/module_items.<worker>.csv until 'merge' folds
+# them into module_items.csv. LEASE_POLL is how often to look again at tracks
+# leased to other workers.
+SHARD_DIR = None
+WORKER_ID = None
+LEASE_TTL = 300
+LEASE_POLL = 30
+
+def setup_driver(headless=True, capture_network=False):
+    return create_chrome(headless, BROWSER_PROFILE, capture_network)
 
 def scrape_course_tracks(driver, course_url, cookies_file='cookies.json'):
-    if not load_cookies(driver, cookies_file):
-        print("Cookie load failed")
-        return []
-
     print(f"Loading course: {course_url}")
-    driver.get(course_url)
-
-    time.sleep(3)
-
-    page_text = driver.page_source.lower()
-    if "login" in page_text or "sign in" in page_text or "please click on login button" in page_text:
-        print("Auth failed")
-        return []
-
-    try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, 'batch_individual_tab__type___wbkY'))
-        )
-    except Exception as e:
-        print("Page load timeout")
+    if not open_course_page(driver, course_url, cookies_file):
         return []
 
     tracks = []
@@ -87,24 +91,11 @@ def scrape_course_tracks(driver, course_url, cookies_file='cookies.json'):
 
     for section_idx, section in enumerate(category_sections):
         try:
-            # Get category name
-            category_header = section.find_element(By.CLASS_NAME, 'batch_category_header___igBF')
-            category_title_elem = category_header.find_element(By.TAG_NAME, 'h3')
-            category_name = category_title_elem.text.strip()
+            category_name = expand_category(driver, section)
+            if category_name is None:
+                continue
             print(f"\nProcessing category: {category_name}")
 
-            # Check if category is collapsed and expand if needed
-            header_classes = category_header.get_attribute('class')
-            if 'batch_open__FkoHN' not in header_classes:
-                print(f"  Category {category_name} is collapsed, expanding...")
-                category_header.click()
-                time.sleep(2)  # Wait for expansion
-                # Re-check if expanded
-                header_classes = category_header.get_attribute('class')
-                if 'batch_open__FkoHN' not in header_classes:
-                    print(f"  Failed to expand {category_name}, skipping...")
-                    continue
-
             # Check if this category has tabs
             try:
                 tab_menu = section.find_element(By.CLASS_NAME, 'ui.pointing.secondary.menu')
@@ -119,7 +110,7 @@ def scrape_course_tracks(driver, course_url, cookies_file='cookies.json'):
                         # Click tab if not already active
                         if 'active' not in tab.get_attribute('class'):
                             tab.click()
-                            time.sleep(2)  # Wait for content to load
+                            wait_for_tab(driver, tab, 'batch_item__ndA6j', 2, 'overview tab', timeout=5)
 
                         # Wait for tracks to load
                         try:
@@ -131,7 +122,8 @@ def scrape_course_tracks(driver, course_url, cookies_file='cookies.json'):
                             continue
 
                         # Scrape tracks from this tab
-                        tab_tracks = scrape_tracks_from_current_view(driver, category_name, tab_name)
+                        tab_tracks = scrape_tracks_from_current_view(driver, category_name, tab_name,
+                                                                     section_idx=section_idx)
                         tracks.extend(tab_tracks)
                         print(f"    Found {len(tab_tracks)} tracks in {tab_name}")
 
@@ -147,7 +139,8 @@ def scrape_course_tracks(driver, course_url, cookies_file='cookies.json'):
                     WebDriverWait(driver, 5).until(
                         lambda d: len(d.find_elements(By.CLASS_NAME, 'batch_item__ndA6j')) > 0
                     )
-                    category_tracks = scrape_tracks_from_current_view(driver, category_name, "Default")
+                    category_tracks = scrape_tracks_from_current_view(driver, category_name, "Default",
+                                                                      section_idx=section_idx)
                     tracks.extend(category_tracks)
                     print(f"  Found {len(category_tracks)} tracks")
                 except Exception as e:
@@ -161,11 +154,216 @@ def scrape_course_tracks(driver, course_url, cookies_file='cookies.json'):
     print(f"\nTotal tracks found: {len(tracks)}")
     return tracks
 
-def scrape_tracks_from_current_view(driver, category_name, tab_name):
-    """Scrape tracks from the currently visible section/tab"""
+def open_course_page(driver, course_url, cookies_file='cookies.json'):
+    """Load the course overview, unless this driver is already showing it"""
+    if (driver.current_url.rstrip('/') == course_url.rstrip('/') and
+            driver.find_elements(By.CLASS_NAME, 'batch_individual_tab__type___wbkY')):
+        return True
+
+    if not get_authenticated(driver, course_url, cookies_file,
+                             wait=lambda d: wait_for_page(d, By.CLASS_NAME, 'batch_individual_tab__type___wbkY', 3, 'course page')):
+        print("Auth failed")
+        return False
+
+    try:
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CLASS_NAME, 'batch_individual_tab__type___wbkY'))
+        )
+    except Exception:
+        print("Page load timeout")
+        return False
+    return True
+
+def expand_category(driver, section):
+    """Expand a category section if it is collapsed; returns its name, or None if it will not open"""
+    category_header = section.find_element(By.CLASS_NAME, 'batch_category_header___igBF')
+    category_name = category_header.find_element(By.TAG_NAME, 'h3').text.strip()
+
+    if 'batch_open__FkoHN' not in category_header.get_attribute('class'):
+        category_header.click()
+        wait_until(driver, has_class(category_header, 'batch_open__FkoHN'), 5, 'category expand', budget=2)
+        if 'batch_open__FkoHN' not in category_header.get_attribute('class'):
+            print(f"  Failed to expand {category_name}, skipping...")
+            return None
+    return category_name
+
+def enumerate_overview_views(driver, course_url, cookies_file='cookies.json'):
+    """List every (category, tab) view of the course overview without scraping it.
+
+    Returns (views, failed), failed naming the categories that could not be listed.
+    """
+    if not open_course_page(driver, course_url, cookies_file):
+        return [], ['course page']
+
+    views = []
+    failed = []
+    category_sections = driver.find_elements(By.CLASS_NAME, 'batch_individual_tab__type___wbkY')
+    for section_idx, section in enumerate(category_sections):
+        try:
+            category_name = expand_category(driver, section)
+            if category_name is None:
+                failed.append(f"category {section_idx}")
+                continue
+
+            tab_menus = section.find_elements(By.CLASS_NAME, 'ui.pointing.secondary.menu')
+            if tab_menus:
+                tabs = tab_menus[0].find_elements(By.CLASS_NAME, 'item')
+                for tab_idx, tab in enumerate(tabs):
+                    views.append({'section_idx': section_idx, 'category': category_name,
+                                  'tab_idx': tab_idx, 'tab': tab.text.strip()})
+            else:
+                views.append({'section_idx': section_idx, 'category': category_name,
+                              'tab_idx': None, 'tab': 'Default'})
+        except Exception as e:
+            print(f"Error enumerating category {section_idx}: {e}")
+            failed.append(f"category {section_idx}")
+
+    print(f"Found {len(views)} views in {len(category_sections)} category sections")
+    return views, failed
+
+def scrape_overview_view(driver, view, course_url, cookies_file='cookies.json'):
+    """Open one (category, tab) view on this driver and scrape its track cards; None if it could not be opened"""
+    if not open_course_page(driver, course_url, cookies_file):
+        return None
+
+    section = driver.find_elements(By.CLASS_NAME, 'batch_individual_tab__type___wbkY')[view['section_idx']]
+    if expand_category(driver, section) is None:
+        return None
+
+    if view['tab_idx'] is not None:
+        tab_menu = section.find_element(By.CLASS_NAME, 'ui.pointing.secondary.menu')
+        tab = tab_menu.find_elements(By.CLASS_NAME, 'item')[view['tab_idx']]
+        if 'active' not in tab.get_attribute('class'):
+            tab.click()
+            wait_for_tab(driver, tab, 'batch_item__ndA6j', 2, 'overview tab', timeout=5)
+
+    try:
+        WebDriverWait(driver, 5).until(
+            lambda d: len(section.find_elements(By.CLASS_NAME, 'batch_item__ndA6j')) > 0
+        )
+    except Exception:
+        print(f"    No tracks found in {view['category']} - {view['tab']}")
+        return []
+
+    return scrape_tracks_from_current_view(driver, view['category'], view['tab'], root=section,
+                                           section_idx=view['section_idx'])
+
+def scrape_course_tracks_parallel(course_url, num_workers=5, cookies_file='cookies.json'):
+    """Enumerate the overview's views on one driver, then scrape them across a driver pool.
+
+    Results are merged in page order (category, then tab) regardless of
+    which worker finished first. A view that fails is retried with backoff
+    up to MAX_ATTEMPTS times. Returns (tracks, failed), failed naming the
+    categories and views that never came through, so callers can tell a
+    partial overview from a complete one.
+    """
+    driver = setup_driver(headless=True)
+    if not driver:
+        return [], ['driver setup']
+    try:
+        views, failed = enumerate_overview_views(driver, course_url, cookies_file)
+    finally:
+        driver.quit()
+
+    results = {}
+    attempts = {}
+
+    def scrape_view(driver, view):
+        key = (view['section_idx'], -1 if view['tab_idx'] is None else view['tab_idx'])
+        label = f"{view['category']} - {view['tab']}"
+        attempts[key] = attempts.get(key, 0) + 1
+        try:
+            tracks = scrape_overview_view(driver, view, course_url, cookies_file)
+            error = None if tracks is not None else 'page or category did not open'
+        except WebDriverException as e:
+            tracks, error = None, str(e).splitlines()[0] if str(e) else 'driver error'
+        except Exception as e:
+            tracks, error = None, str(e)
+
+        if tracks is None:
+            if attempts[key] < MAX_ATTEMPTS:
+                delay = backoff_delay(attempts[key])
+                print(f"    View {label} failed ({error}), retrying in {delay:.1f}s")
+                raise Requeue(delay, restart_driver=True, reason=error)
+            print(f"    Giving up on view {label} after {attempts[key]} attempts ({error})")
+            failed.append(label)
+            return False
+        results[key] = tracks
+        print(f"    Found {len(tracks)} tracks in {label}")
+
+    leftover = run_driver_pool(views, scrape_view, lambda: setup_driver(headless=True), num_workers=num_workers)
+    if leftover:
+        failed.append(f"{leftover} views never scraped (driver setup failed)")
+
+    tracks = []
+    for key in sorted(results):
+        tracks.extend(results[key])
+    print(f"\nTotal tracks found: {len(tracks)}")
+    return tracks, failed
+
+def save_tracks_csv(tracks, tracks_csv):
+    with open(tracks_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=TRACK_FIELDNAMES, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(tracks)
+
+TRACK_CARDS_SCRIPT = """
+return Array.from((arguments[0] || document).getElementsByClassName('batch_item__ndA6j')).map(el => {
+    const title = el.querySelector('.batch_title__XImuz');
+    const link = el.closest('a');
+    const meta = el.querySelector('.batch_content_meta__8RbQN');
+    return {
+        title: title ? title.innerText : null,
+        url: link ? link.href : null,
+        metas: meta ? Array.from(meta.getElementsByTagName('p')).map(p => p.innerText) : [],
+        imgs: Array.from(el.getElementsByTagName('img')).map(img => img.src || ''),
+        classes: el.className
+    };
+});
+"""
+
+def scrape_tracks_from_current_view(driver, category_name, tab_name, root=None, section_idx=None):
+    """Scrape tracks from the currently visible section/tab.
+
+    root limits extraction to one category section element; by default the
+    whole document is scanned. section_idx is stored with the snapshot so
+    reparse reads the same section.
+    """
+    if EXTRACTION_MODE == 'element':
+        capture_view(driver, 'overview', driver.current_url, f"{category_name}/{tab_name}",
+                     category=category_name, tab_name=tab_name, section_idx=section_idx)
+        return scrape_tracks_per_element(driver, category_name, tab_name, root)
+
+    tracks = []
+
+    page_html = capture_view(driver, 'overview', driver.current_url, f"{category_name}/{tab_name}",
+                             category=category_name, tab_name=tab_name, section_idx=section_idx)
+    if EXTRACTION_MODE == 'html':
+        if root is not None:
+            page_html = root.get_attribute('outerHTML')
+        cards = parse_track_cards(page_html, driver.current_url)
+    else:
+        cards = driver.execute_script(TRACK_CARDS_SCRIPT, root)
+    print(f"    Found {len(cards)} track elements in {category_name} - {tab_name}")
+
+    for card in cards:
+        if card['title'] is None or card['url'] is None:
+            continue
+
+        track_data = track_fields(card)
+        track_data['category'] = category_name
+        track_data['tab'] = tab_name
+
+        if track_data.get('url'):
+            tracks.append(track_data)
+
+    return tracks
+
+def scrape_tracks_per_element(driver, category_name, tab_name, root=None):
+    """Scrape tracks from the currently visible section/tab, one WebDriver call per element"""
     tracks = []
 
-    track_elements = driver.find_elements(By.CLASS_NAME, 'batch_item__ndA6j')
+    track_elements = (root or driver).find_elements(By.CLASS_NAME, 'batch_item__ndA6j')
     print(f"    Found {len(track_elements)} track elements in {category_name} - {tab_name}")
 
     for elem in track_elements:
@@ -209,22 +407,26 @@ def scrape_tracks_from_current_view(driver, category_name, tab_name):
     return tracks
 
 def scrape_module_items(driver, track_url, cookies_file='cookies.json'):
-    if not load_cookies(driver, cookies_file):
-        print("Cookie load failed")
-        return []
-
     print(f"Loading module: {track_url}")
-    driver.get(track_url)
-
-    # Wait for page to load
-    time.sleep(5)
+    if EXTRACTION_MODE == 'json':
+        drain_performance_log(driver)
+        page_wait = lambda d: wait_for_document(d, 5, 'track page')
+    else:
+        page_wait = lambda d: wait_for_page(d, By.CLASS_NAME, 'sidebar_tabs__JmBlR', 5, 'track page')
 
-    # Check if we're still on a login page
-    page_text = driver.page_source.lower()
-    if "login" in page_text or "sign in" in page_text or "please click on login button" in page_text:
+    # Wait for page to load, then check if we're still on a login page
+    if not get_authenticated(driver, track_url, cookies_file, wait=page_wait):
         print("Auth failed for track")
+        TRACK_FAILURES[track_url] = 'auth'
         return []
 
+    if EXTRACTION_MODE == 'json':
+        items = capture_module_items(driver, track_url)
+        if items:
+            TRACK_STRATEGIES[track_url] = 'json'
+            return items
+        print("No items in captured responses, falling back to DOM scraping")
+
     # Try to wait for sidebar tabs (for track pages)
     sidebar_found = False
     try:
@@ -243,115 +445,38 @@ def scrape_module_items(driver, track_url, cookies_file='cookies.json'):
         def scrape_tab_items(tab_name, expected_type=None):
             tab_items = []
             try:
-                tabs = driver.find_elements(By.CLASS_NAME, 'sidebar_tabs__JmBlR')
-                target_tab = None
-
-                for tab in tabs:
-                    try:
-                        p_elem = tab.find_element(By.TAG_NAME, 'p')
-                        tab_text = p_elem.text.lower().strip()
-                    except:
-                        tab_text = tab.text.lower().strip()
-
-                    if tab_name in tab_text:
-                        target_tab = tab
-                        break
-
+                target_tab = find_sidebar_tab(driver, tab_name)
                 if not target_tab:
                     return tab_items
 
                 if 'active' not in target_tab.get_attribute('class'):
-                    target_tab.click()
-                    time.sleep(3)
-
-                    try:
-                        WebDriverWait(driver, 10).until(
-                            lambda d: len(d.find_elements(By.CLASS_NAME, 'sidebar_item__khyNp')) > 0
-                        )
-                    except:
-                        return tab_items
-
-                sidebar_items = driver.find_elements(By.CLASS_NAME, 'sidebar_item__khyNp')
-
-                for item in sidebar_items:
-                    item_data = {}
-
-                    try:
-                        title_elem = item.find_element(By.TAG_NAME, 'p')
-                        item_data['title'] = title_elem.text.strip()
-                    except:
-                        continue
-
-                    try:
-                        item_data['url'] = item.get_attribute('href')
-                    except:
-                        continue
+                    with span('tab click'):
+                        target_tab.click()
+                        wait_for_tab(driver, target_tab, 'sidebar_item__khyNp', 3, 'sidebar tab')
 
-                    if expected_type:
-                        item_data['type'] = expected_type
-                    else:
-                        # Simple type detection based on URL patterns
-                        url = item_data.get('url', '')
-                        if '/video/' in url or 'video' in url.lower():
-                            item_data['type'] = 'video'
-                        elif '/article/' in url or 'article' in url.lower():
-                            item_data['type'] = 'article'
-                        else:
-                            # Try to detect from meta text or images as fallback
-                            try:
-                                imgs = item.find_elements(By.TAG_NAME, 'img')
-                                for img in imgs:
-                                    src = img.get_attribute('src') or ''
-                                    if 'video' in src.lower() or 'youtube' in src.lower():
-                                        item_data['type'] = 'video'
-                                        break
-                                    elif 'article' in src.lower() or 'book' in src.lower():
-                                        item_data['type'] = 'article'
-                                        break
-
-                                if not item_data.get('type'):
-                                    try:
-                                        meta_elem = item.find_element(By.CLASS_NAME, 'sidebar_meta__9J4r4')
-                                        meta_text = meta_elem.text.strip()
-                                        item_data['meta'] = meta_text
-                                        if 'Duration' in meta_text or 'min' in meta_text or 'sec' in meta_text:
-                                            item_data['type'] = 'video'
-                                        elif 'Last Updated' in meta_text:
-                                            item_data['type'] = 'article'
-                                        else:
-                                            item_data['type'] = 'unknown'
-                                    except:
-                                        item_data['type'] = 'unknown'
-                            except:
-                                item_data['type'] = 'unknown'
-
-                    if not item_data.get('meta'):
                         try:
-                            meta_elem = item.find_element(By.CLASS_NAME, 'sidebar_meta__9J4r4')
-                            item_data['meta'] = meta_elem.text.strip()
+                            WebDriverWait(driver, 10).until(
+                                lambda d: len(d.find_elements(By.CLASS_NAME, 'sidebar_item__khyNp')) > 0
+                            )
                         except:
-                            pass
+                            return tab_items
 
-                    if item_data.get('title') and item_data.get('url'):
-                        tab_items.append(item_data)
+                with span('snapshot'):
+                    page_html = capture_view(driver, 'module', track_url, tab_name)
+                with span(f"extract {EXTRACTION_MODE}"):
+                    tab_items.extend(extract_sidebar_items(driver, expected_type, page_html))
 
             except Exception as e:
                 pass
 
             return tab_items
 
-        video_items = scrape_tab_items('videos', 'video')
-        items.extend(video_items)
-
-        article_items = scrape_tab_items('articles', 'article')
-        items.extend(article_items)
-
-        if len(items) < 5:
-            all_items = scrape_tab_items('all')
-            existing_urls = {item['url'] for item in items}
-            for item in all_items:
-                if item['url'] not in existing_urls:
-                    items.append(item)
+        # One click on 'all' covers the common case; the per-type tabs are only
+        # needed when there is no 'all' tab or it came back incomplete
+        labels = sidebar_tab_labels(driver)
+        all_items = scrape_tab_items('all') if any('all' in label for label in labels) else []
+        items, strategy = choose_tab_items(
+            labels, all_items, lambda: scrape_tab_items('videos', 'video') + scrape_tab_items('articles', 'article'))
     else:
         # Fallback: try to scrape items directly from the page
         print("Attempting direct item scraping...")
@@ -367,7 +492,7 @@ def scrape_module_items(driver, track_url, cookies_file='cookies.json'):
                         item_data = {
                             'title': title,
                             'url': href,
-                            'type': 'video' if '/video/' in href or 'video' in href.lower() else 'article' if '/article/' in href or 'article' in href.lower() else 'unknown'
+                            'type': detect_item_type(href)
                         }
                         items.append(item_data)
 
@@ -375,16 +500,346 @@ def scrape_module_items(driver, track_url, cookies_file='cookies.json'):
             seen_urls = set()
             unique_items = []
             for item in items:
-                if item['url'] not in seen_urls:
-                    seen_urls.add(item['url'])
+                if canonical_key(item['url']) not in seen_urls:
+                    seen_urls.add(canonical_key(item['url']))
                     unique_items.append(item)
             items = unique_items
 
         except Exception as e:
             print(f"Direct scraping failed: {e}")
+        strategy = 'direct'
+        if not items:
+            TRACK_FAILURES[track_url] = 'selector-miss'
+
+    TRACK_STRATEGIES[track_url] = strategy
+    return items
+
+def sidebar_tab_labels(driver):
+    """Lowercased labels of the sidebar tabs, e.g. ['all (12)', 'videos (7)', 'articles (5)']"""
+    labels = []
+    for tab in driver.find_elements(By.CLASS_NAME, 'sidebar_tabs__JmBlR'):
+        try:
+            labels.append(tab.find_element(By.TAG_NAME, 'p').text.lower().strip())
+        except:
+            labels.append(tab.text.lower().strip())
+    return labels
+
+def find_sidebar_tab(driver, tab_name):
+    for tab in driver.find_elements(By.CLASS_NAME, 'sidebar_tabs__JmBlR'):
+        try:
+            tab_text = tab.find_element(By.TAG_NAME, 'p').text.lower().strip()
+        except:
+            tab_text = tab.text.lower().strip()
+        if tab_name in tab_text:
+            return tab
+    return None
+
+def choose_tab_items(labels, all_items, per_type_items):
+    """A track's items from its sidebar tabs, as (items, strategy); shared by live scraping and reparse.
+
+    The 'all' tab is used alone when all_tab_complete; otherwise
+    per_type_items() (videos then articles) is called and whatever only
+    'all' listed is appended.
+    """
+    if all_tab_complete(all_items, labels):
+        return all_items, 'all'
+
+    items = per_type_items()
+    existing_urls = {canonical_key(item['url']) for item in items}
+    for item in all_items:
+        if canonical_key(item['url']) not in existing_urls:
+            existing_urls.add(canonical_key(item['url']))
+            items.append(item)
+    return items, 'per-type+all' if all_items else 'per-type'
+
+def all_tab_complete(all_items, labels):
+    """True when the 'all' tab gave every item: none unclassified, and no fewer than the tab labels advertise"""
+    if not all_items or any(item['type'] == 'unknown' for item in all_items):
+        return False
+
+    counts = {}
+    for label in labels:
+        match = re.search(r'\d+', label)
+        if match:
+            counts['all' if 'all' in label else label] = int(match.group())
+    if 'all' in counts:
+        return len(all_items) >= counts['all']
+    return len(all_items) >= sum(counts.values())
+
+def extract_sidebar_items_per_element(driver, expected_type=None):
+    """Extract sidebar items with one WebDriver call per element"""
+    items = []
+
+    sidebar_items = driver.find_elements(By.CLASS_NAME, 'sidebar_item__khyNp')
+
+    for item in sidebar_items:
+        item_data = {}
+
+        try:
+            title_elem = item.find_element(By.TAG_NAME, 'p')
+            item_data['title'] = title_elem.text.strip()
+        except:
+            continue
+
+        try:
+            item_data['url'] = item.get_attribute('href')
+        except:
+            continue
+
+        try:
+            meta_elem = item.find_element(By.CLASS_NAME, 'sidebar_meta__9J4r4')
+            item_data['meta'] = meta_elem.text.strip()
+        except:
+            pass
+
+        if expected_type:
+            item_data['type'] = expected_type
+        else:
+            # The URL alone settles almost every item; only look at images when it does not
+            item_data['type'] = detect_item_type(item_data['url'], meta_text=item_data.get('meta'))
+            if not url_kind_segment(item_data['url']):
+                try:
+                    imgs = item.find_elements(By.TAG_NAME, 'img')
+                    item_data['type'] = detect_item_type(
+                        item_data['url'], [img.get_attribute('src') or '' for img in imgs],
+                        item_data.get('meta'), [img.get_attribute('alt') or '' for img in imgs])
+                except:
+                    pass
+
+        if item_data.get('title') and item_data.get('url'):
+            items.append(item_data)
 
     return items
 
+SIDEBAR_ITEMS_SCRIPT = """
+return Array.from(document.getElementsByClassName('sidebar_item__khyNp')).map(el => {
+    const title = el.querySelector('p');
+    const meta = el.querySelector('.sidebar_meta__9J4r4');
+    return {
+        title: title ? title.innerText : null,
+        url: el.tagName === 'A' ? el.href : el.getAttribute('href'),
+        imgs: Array.from(el.getElementsByTagName('img')).map(img => img.src || ''),
+        alts: Array.from(el.getElementsByTagName('img')).map(img => img.alt || ''),
+        meta: meta ? meta.innerText : null,
+        classes: el.className
+    };
+});
+"""
+
+def extract_sidebar_items_bulk(driver, expected_type=None):
+    """Extract all sidebar items of the current view with a single script call"""
+    raw_items = driver.execute_script(SIDEBAR_ITEMS_SCRIPT)
+    return [item for item in (sidebar_item_fields(raw, expected_type) for raw in raw_items) if item]
+
+def extract_sidebar_items_html(driver, expected_type=None, page_html=None):
+    """Extract sidebar items from page_source with the shared lxml engine"""
+    if page_html is None:
+        page_html = driver.page_source
+    raw_items = parse_sidebar_items(page_html, driver.current_url)
+    return [item for item in (sidebar_item_fields(raw, expected_type) for raw in raw_items) if item]
+
+def extract_sidebar_items(driver, expected_type=None, page_html=None):
+    if EXTRACTION_MODE == 'bulk':
+        return extract_sidebar_items_bulk(driver, expected_type)
+    if EXTRACTION_MODE == 'html':
+        return extract_sidebar_items_html(driver, expected_type, page_html)
+    return extract_sidebar_items_per_element(driver, expected_type)
+
+def scrape_module_items_http(fetcher, track_url, cookies_file='cookies.json'):
+    """Scrape a track page over plain HTTP, falling back to the browser scrape"""
+    page_html = fetcher.http.fetch(track_url)
+    if not needs_browser(page_html, 'sidebar_item__khyNp'):
+        if SNAPSHOT_STORE is not None:
+            SNAPSHOT_STORE.put(track_url, 'all', page_html, 'module')
+        raw_items = parse_sidebar_items(page_html, track_url)
+        items = [item for item in (sidebar_item_fields(raw) for raw in raw_items) if item]
+        if items:
+            fetcher.http_fetches += 1
+            TRACK_STRATEGIES[track_url] = 'http'
+            return items
+
+    print(f"Falling back to browser for {track_url}")
+    driver = fetcher.driver()
+    if not driver:
+        return []
+    fetcher.browser_fetches += 1
+    return scrape_module_items(driver, track_url, cookies_file)
+
+def capture_module_items(driver, track_url, timeout=10, idle=1.0):
+    """Build module items straight from the JSON responses behind the track page.
+
+    Responses are collected until the network has been quiet for `idle`
+    seconds, so later XHRs (a separate articles call, further pages) are not
+    cut off. The items are only used when they cover what the sidebar tabs
+    advertise; otherwise [] sends the caller to DOM scraping.
+    """
+    responses = []
+    pending = {}
+    last_activity = time.time()
+
+    def network_idle(d):
+        nonlocal last_activity
+        fresh = collect_json_responses(d, pending)
+        if fresh or pending:
+            responses.extend(fresh)
+            last_activity = time.time()
+            return False
+        return time.time() - last_activity >= idle
+
+    wait_until(driver, network_idle, timeout, 'json capture')
+    if responses and RECORDINGS_DIR:
+        save_recordings(responses, RECORDINGS_DIR)
+    items = items_from_responses(responses, track_url)
+    if not items:
+        return []
+
+    labels = sidebar_tab_labels(driver)
+    if not all_tab_complete(items, labels):
+        print(f"Captured {len(items)} items, fewer than the sidebar advertises ({', '.join(labels)})")
+        return []
+    print(f"Built {len(items)} items from {len(responses)} captured JSON responses")
+    return items
+
+def capture_view(driver, kind, url, tab, **extra):
+    """Return the current page_source, persisting it when snapshots are enabled"""
+    if SNAPSHOT_STORE is None and EXTRACTION_MODE != 'html':
+        return None
+
+    page_html = driver.page_source
+    if SNAPSHOT_STORE is not None:
+        try:
+            SNAPSHOT_STORE.put(url, tab, page_html, kind, **extra)
+        except Exception as e:
+            print(f"Snapshot error: {e}")
+    return page_html
+
+def reparse_snapshots(store, tracks_csv, items_csv):
+    """Rebuild course_tracks.csv and module_items.csv from stored snapshots, no browser needed.
+
+    Only the overview views and tracks that have a snapshot are replaced;
+    every other row (e.g. tracks scraped before snapshots were kept) stays
+    where it is.
+    """
+    view_tracks = {}
+    seen_tracks = set()
+    for entry in store.entries('overview'):
+        category = entry.get('category', 'Unknown')
+        tab_name = entry.get('tab_name', 'Default')
+        # Snapshots stored before section_idx was recorded are parsed whole
+        for card in parse_track_cards(store.get(entry['digest']), entry['url'], entry.get('section_idx')):
+            if card['title'] is None or card['url'] is None:
+                continue
+            key = (card['url'], category, tab_name)
+            if key in seen_tracks:
+                continue
+            seen_tracks.add(key)
+            track_data = track_fields(card)
+            track_data['category'] = category
+            track_data['tab'] = tab_name
+            view_tracks.setdefault((category, tab_name), []).append(track_data)
+
+    # Group tab snapshots per track, keeping first-capture order
+    track_tabs = {}
+    for entry in store.entries('module'):
+        track_tabs.setdefault(entry['url'], {})[entry['tab']] = entry
+
+    track_items = {}
+    for track_url, tabs in track_tabs.items():
+        def tab_items(tab_name):
+            entry = tabs.get(tab_name)
+            if not entry:
+                return []
+            raw_items = parse_sidebar_items(store.get(entry['digest']), track_url)
+            return [item for item in (sidebar_item_fields(raw, TAB_TYPES[tab_name]) for raw in raw_items) if item]
+
+        # Same tab strategy as the live scrape, with the labels read from the first stored view
+        labels = parse_sidebar_tab_labels(store.get(next(iter(tabs.values()))['digest']))
+        items, _ = choose_tab_items(labels, tab_items('all'), lambda: tab_items('videos') + tab_items('articles'))
+        if items:
+            track_items.setdefault(track_slug_from_url(track_url), []).extend(items)
+
+    tracks = splice_rows(load_tracks_from_csv(tracks_csv), view_tracks,
+                         lambda row: (row.get('category'), row.get('tab')))
+    items = splice_rows(read_item_rows(items_csv) if os.path.exists(items_csv) else [], track_items,
+                        lambda row: track_slug_from_url(row.get('url')))
+    if view_tracks:
+        save_tracks_csv(tracks, tracks_csv)
+    if track_items:
+        with open(items_csv, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=ITEM_FIELDNAMES, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(items)
+
+    print(f"Reparsed {sum(map(len, view_tracks.values()))} tracks from {len(view_tracks)} overview views and "
+          f"{sum(map(len, track_items.values()))} items from {len(track_items)} track snapshots; "
+          f"{len(tracks)} tracks and {len(items)} items in the CSVs")
+    return tracks, items
+
+def splice_rows(rows, replacements, group):
+    """rows with every group in replacements swapped for its new rows at the place of its first row.
+
+    group(row) names a row's group; groups not in rows yet go at the end.
+    """
+    spliced = []
+    placed = set()
+    for row in rows:
+        key = group(row)
+        if key not in replacements:
+            spliced.append(row)
+        elif key not in placed:
+            placed.add(key)
+            spliced.extend(replacements[key])
+    for key, new_rows in replacements.items():
+        if key not in placed:
+            spliced.extend(new_rows)
+    return spliced
+
+def merge_item_shards(shard_dir, tracks_csv, items_csv, progress_db):
+    """Fold every worker's module_items shard into module_items.csv and the progress store.
+
+    Rows already known under any URL spelling are dropped. The rest go out in
+    course_tracks.csv order (unlisted tracks last, by slug), each track's rows
+    in shard order with shards read by file name, so the result does not
+    depend on which worker claimed which track. The merged shards, their
+    stores and the track leases are removed afterwards.
+    """
+    shard_paths = sorted(glob.glob(os.path.join(shard_dir, 'module_items.*.csv')))
+    if not shard_paths:
+        print(f"No module_items shards in {shard_dir}")
+        return []
+
+    by_track = {}
+    for path in shard_paths:
+        for row in read_item_rows(path):
+            if row.get('url'):
+                by_track.setdefault(track_slug_from_url(row['url']) or '', []).append(row)
+
+    order = {}
+    for track in load_tracks_from_csv(tracks_csv):
+        order.setdefault(track_slug(track.get('url'), track.get('title')), len(order))
+
+    store = ProgressStore(progress_db)
+    store.import_items_csv(items_csv)
+    merged = []
+    for slug in sorted(by_track, key=lambda slug: (order.get(slug, len(order)), slug)):
+        fresh = store.new_items(by_track[slug])
+        store.upsert_items(fresh, slug or None)
+        merged.extend(fresh)
+
+    with open(items_csv, 'a', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=ITEM_FIELDNAMES, extrasaction='ignore')
+        if csvfile.tell() == 0:
+            writer.writeheader()
+        writer.writerows(merged)
+        csvfile.flush()
+        os.fsync(csvfile.fileno())
+
+    for path in shard_paths + glob.glob(os.path.join(shard_dir, 'progress.scan.*.db*')):
+        os.remove(path)
+    shutil.rmtree(os.path.join(shard_dir, 'leases', 'tracks'), ignore_errors=True)
+    print(f"Merged {len(merged)} new items from {len(shard_paths)} shards into {items_csv}")
+    return merged
+
 def load_tracks_from_csv(csv_file='course_tracks.csv'):
     """Load tracks from existing CSV file"""
     tracks = []
@@ -410,7 +865,45 @@ def test_single_module(driver, track_url, cookies_file='cookies.json'):
 
     return items
 
-def main():
+def track_slug(track_url, title=None):
+    """Extract the track name from a URL like /batch/dsa-jiit/track/TRACK-NAME/video/..."""
+    slug = track_slug_from_url(track_url)
+    if slug:
+        return slug
+    if title:
+        return title.replace(' ', '-').lower()  # Fallback
+    return None
+
+def advertised_counts(track):
+    """{'videos': 9, 'articles': 9, ...} from the '9 Videos' style columns of course_tracks.csv"""
+    counts = {}
+    for field in ('videos', 'articles', 'problems', 'mcqs'):
+        match = re.match(r'\s*(\d+)', track.get(field) or '')
+        counts[field] = int(match.group(1)) if match else None
+    return counts
+
+def card_fingerprint(track):
+    """Hash of what the overview card advertises for a track"""
+    fields = [track.get(field) or '' for field in ('title', 'url', 'videos', 'articles', 'problems', 'mcqs')]
+    return hashlib.sha1('|'.join(fields).encode('utf-8')).hexdigest()
+
+def track_changed(track, slug, state, stored_counts):
+    """Whether a track needs a re-scrape in incremental mode"""
+    if state and state.get('card_fingerprint'):
+        return state['card_fingerprint'] != card_fingerprint(track)
+
+    # Never fingerprinted: compare the advertised counts with the items we hold
+    have = stored_counts.get(slug)
+    if not have:
+        return True
+    advertised = advertised_counts(track)
+    if advertised['videos'] is None and advertised['articles'] is None:
+        return False
+    return ((advertised['videos'] or 0) != have.get('video', 0) or
+            (advertised['articles'] or 0) != have.get('article', 0))
+
+def main(max_threads=5, incremental=False, min_threads=1, ceiling=None):
+    """Scrape pending tracks; with a ceiling the worker count adapts between min_threads and ceiling"""
     base_dir = os.path.dirname(os.path.abspath(__file__))
 
     # Load existing tracks from CSV
@@ -424,7 +917,7 @@ def main():
     print(f"Loaded {len(tracks)} tracks from CSV")
 
     # Test with a single track first
-    test_driver = setup_driver(headless=True)
+    test_driver = setup_driver(headless=True, capture_network=EXTRACTION_MODE == 'json')
     if test_driver:
         try:
             test_track_url = "https://www.geeksforgeeks.org/batch/dsa-jiit/track/Java-Foundation-Data-Types-2"
@@ -446,44 +939,39 @@ def main():
         print("Failed to create test driver")
         return
 
-    # Load existing items to avoid reprocessing
+    # Load existing items to avoid reprocessing; only rows appended since the last import are read
     items_csv = os.path.join(base_dir, 'module_items.csv')
-    processed_track_titles = set()
-    existing_items_count = 0
-
-    if os.path.exists(items_csv):
-        try:
-            with open(items_csv, 'r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    if 'url' in row and row['url']:
-                        # Extract track name from item URL
-                        # URL format: /batch/dsa-jiit/track/TRACK-NAME/video/... or /article/...
-                        try:
-                            url_parts = row['url'].split('/')
-                            track_index = url_parts.index('track')
-                            if track_index < len(url_parts) - 1:
-                                track_name = url_parts[track_index + 1].split('/')[0]  # Remove any suffixes
-                                processed_track_titles.add(track_name)
-                        except (ValueError, IndexError):
-                            pass
-                        existing_items_count += 1
-            print(f"Found {existing_items_count} existing items from {len(processed_track_titles)} processed tracks")
-        except Exception as e:
-            print(f"Error reading existing CSV: {e}")
-            processed_track_titles = set()
+    leases = None
+    if SHARD_DIR:
+        # Hosts may not share a safe SQLite file, so each worker keeps a private store and CSV shard
+        shard_name = WORKER_ID or worker_id()
+        leases = LeaseStore(os.path.join(SHARD_DIR, 'leases', 'tracks'), LEASE_TTL, shard_name).start()
+        store = ProgressStore(os.path.join(SHARD_DIR, f'progress.scan.{shard_name}.db'))
+        shard_csv = os.path.join(SHARD_DIR, f'module_items.{shard_name}.csv')
+        print(f"Worker {shard_name}: claiming tracks under {SHARD_DIR}, writing {shard_csv}")
+    else:
+        store = ProgressStore(os.path.join(base_dir, PROGRESS_DB))
+        shard_csv = items_csv
+    if store.import_items_csv(items_csv):
+        print(f"Imported {items_csv} into {PROGRESS_DB}")
+    processed_track_titles = store.processed_track_slugs()
+    stored_counts = store.item_counts_by_track() if incremental else {}
+    print(f"Found {sum(store.counts().values())} existing items from {len(processed_track_titles)} processed tracks")
 
-    # Parallel processing with multiple threads
-    max_threads = 5  # Adjust based on system capabilities
     lock = threading.Lock()
-    threads = []
     completed_tracks = 0
-
-    def scrape_and_save(track, cookies_file):
-        nonlocal completed_tracks
-        track_url = track['url']
+    strategies = {}
+    attempts = {}
+    failures = {}
+    abandoned = []
+    held_elsewhere = []
+    breaker = CircuitBreaker()
+    items_writer = BatchedCsvWriter(shard_csv, ITEM_FIELDNAMES)
+
+    def should_scrape(track):
+        track_url = track.get('url')
         if not track_url:
-            return
+            return False
 
         # Skip quiz, mock, and problems tracks
         track_title_lower = track['title'].lower()
@@ -491,134 +979,176 @@ def main():
             'mock' in track_title_lower or 'mock' in track_url.lower() or
             'problems' in track_title_lower or 'problems' in track_url.lower()):
             print(f"Skipping quiz/mock/problems track: {track['title']}")
-            return
+            return False
 
-        # Extract track name from URL
-        try:
-            url_parts = track_url.split('/')
-            track_index = url_parts.index('track')
-            if track_index < len(url_parts) - 1:
-                track_name = url_parts[track_index + 1].split('/')[0]  # Remove any suffixes
-            else:
-                track_name = track['title'].replace(' ', '-').lower()  # Fallback
-        except (ValueError, IndexError):
-            track_name = track['title'].replace(' ', '-').lower()  # Fallback
+        slug = track_slug(track_url, track['title'])
+        if incremental:
+            if track_changed(track, slug, store.track_state(slug), stored_counts):
+                return True
+            # Unchanged: remember the card so later runs only compare fingerprints
+            store.set_card_fingerprint(slug, track['title'], track_url, card_fingerprint(track))
+            return False
 
         # Check if already processed
-        if track_name in processed_track_titles:
+        if slug in processed_track_titles:
             print(f"Skipping already processed track: {track['title']}")
-            return
-
-        print(f"Processing track {completed_tracks + 1}: {track['title']}")
+            return False
 
-        # Create driver for this thread
-        driver = setup_driver(headless=True)
-        if not driver:
-            print(f"Failed to create driver for {track['title']}")
-            return
+        return True
 
-        try:
-            max_retries = 1  # Reduced from 3 to 1
-            items = []
-            for attempt in range(max_retries):
-                try:
-                    items = scrape_module_items(driver, track_url, cookies_file)
-                    if items:
-                        break
-                    else:
-                        print(f"Attempt {attempt+1}: No items found")
-                except Exception as e:
-                    print(f"Attempt {attempt+1} failed: {e}")
-                    if attempt < max_retries - 1:
-                        time.sleep(5)
-                    else:
-                        print(f"Failed after {max_retries} attempts")
-
-            if items:
-                # Immediately save to CSV
+    def scrape_and_save(worker, track):
+        track_url = track['url']
+        if leases and not leases.claim(track_url):
+            if not leases.is_done(track_url):
                 with lock:
-                    try:
-                        file_exists = os.path.exists(items_csv)
-                        with open(items_csv, 'a', newline='', encoding='utf-8') as csvfile:
-                            fieldnames = ['type', 'title', 'url', 'meta']
-                            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                            if not file_exists:
-                                writer.writeheader()
-                            for item in items:
-                                writer.writerow(item)
-                        processed_track_titles.add(track_name)
-                        completed_tracks += 1
-                        print(f"Saved {len(items)} items for track: {track['title']}")
-                    except Exception as e:
-                        print(f"Error saving items for {track['title']}: {e}")
-        finally:
-            driver.quit()
-
-    for i in range(0, len(tracks), max_threads):
-        batch = tracks[i:i + max_threads]
+                    held_elsewhere.append(track)
+            return SKIPPED
+        with track_span(track_slug(track_url, track['title'])):
+            scraped = scrape_track(worker, track)
+        # A Requeue keeps the lease for the retry; giving up hands the track to other workers.
+        # scrape_track has checkpointed the rows, so the .done marker never gets ahead of the shard
+        if leases:
+            if scraped:
+                leases.complete(track_url)
+            else:
+                leases.release(track_url)
+        return scraped
 
-        # Start threads for this batch
-        for track in batch:
-            thread = threading.Thread(
-                target=scrape_and_save,
-                args=(track, 'cookies.json')
-            )
-            threads.append(thread)
-            thread.start()
+    def scrape_track(worker, track):
+        nonlocal completed_tracks
+        track_url = track['url']
+        track_name = track_slug(track_url, track['title'])
 
-        # Wait for all threads in this batch to complete
-        for thread in threads:
-            thread.join()
+        attempt = attempts.get(track_url, 0) + 1
+        attempts[track_url] = attempt
+        print(f"Processing track: {track['title']}" + (f" (attempt {attempt})" if attempt > 1 else ''))
 
-        threads = []  # Reset for next batch
+        items = []
+        failure = None
+        try:
+            with span('scrape'):
+                if FETCH_BACKEND == 'http':
+                    items = scrape_module_items_http(worker, track_url, 'cookies.json')
+                else:
+                    items = scrape_module_items(worker, track_url, 'cookies.json')
+        except TimeoutException:
+            failure = 'timeout'
+        except WebDriverException as e:
+            # The browser itself is broken (crashed tab, lost session); retry on a fresh one
+            failure = 'driver'
+            print(f"Driver failure on {track['title']}: {str(e).splitlines()[0] if str(e) else e}")
+        except Exception as e:
+            failure = 'error'
+            print(f"Scrape of {track['title']} failed: {e}")
+        if not items and failure is None:
+            failure = TRACK_FAILURES.pop(track_url, 'empty')
+        TRACK_FAILURES.pop(track_url, None)
+
+        if failure:
+            with lock:
+                failures[failure] = failures.get(failure, 0) + 1
+            if failure == 'auth':
+                breaker.record_failure()
+            if attempt < MAX_ATTEMPTS:
+                delay = backoff_delay(attempt)
+                print(f"Track {track['title']} failed ({failure}), requeued in {delay:.1f}s")
+                raise Requeue(delay, restart_driver=failure == 'driver', reason=failure)
+            print(f"Giving up on {track['title']} after {attempt} attempts ({failure})")
+            with lock:
+                abandoned.append(track['title'])
+            return False
+
+        if items:
+            # Only items not already known under any URL spelling go to the CSV. They are on disk
+            # before the store marks the track done, so a crash in between costs a re-scrape
+            # rather than rows the store already counts as written
+            strategy = TRACK_STRATEGIES.pop(track_url, None)
+            new_items = store.new_items(items)
+            with span('csv write'):
+                items_writer.write_rows(new_items)
+                items_writer.checkpoint()
+            with span('store'):
+                _, removed = store.apply_track_scan(track_name, track['title'], track_url, items,
+                                                    card_fingerprint(track), strategy)
+            if incremental:
+                print(f"Track {track['title']}: {len(new_items)} added, {len(removed)} removed")
+            with span('lock'), lock:
+                processed_track_titles.add(track_name)
+                completed_tracks += 1
+                strategies[strategy] = strategies.get(strategy, 0) + 1
+            print(f"Saved {len(items)} items for track: {track['title']} ({completed_tracks} done)")
+        return bool(items)
+
+    pending_tracks = [track for track in tracks if should_scrape(track)]
+    if leases:
+        pending_tracks = [track for track in pending_tracks if not leases.is_done(track['url'])]
+    if incremental:
+        print(f"Incremental mode: {len(pending_tracks)} of {len(tracks)} tracks changed")
+    limiter = None
+    if ceiling and ceiling > min_threads:
+        limiter = AdaptiveLimiter(floor=min_threads, ceiling=ceiling, initial=max_threads)
+        print(f"Scraping {len(pending_tracks)} tracks with {limiter.limit} workers (adaptive, {min_threads}-{ceiling})")
+    else:
+        print(f"Scraping {len(pending_tracks)} tracks with {max_threads} workers")
 
-        print(f"Completed batch {i//max_threads + 1}, total tracks processed: {completed_tracks}")
+    driver_factory = lambda: setup_driver(headless=True, capture_network=EXTRACTION_MODE == 'json')
+    http = None
+    if FETCH_BACKEND == 'http':
+        http = HttpFetcher('cookies.json', pool_size=limiter.ceiling if limiter else max_threads)
+        worker_factory = lambda: FallbackFetcher(http, driver_factory)
+    else:
+        worker_factory = driver_factory
+
+    # Tracks another worker holds are passed over; once the pool drains, wait for those
+    # leases to finish or expire (a dead worker's) and run the pool again on what is left
+    leftover = 0
+    remaining = pending_tracks
+    while remaining:
+        held_elsewhere.clear()
+        leftover += run_driver_pool(remaining, scrape_and_save, worker_factory,
+                                    num_workers=limiter.ceiling if limiter else max_threads, limiter=limiter,
+                                    breaker=breaker)
+        remaining = [track for track in held_elsewhere if not leases.is_done(track['url'])]
+        if remaining:
+            wait = min(LEASE_POLL, max(1.0, leases.expires_in(track['url'] for track in remaining)))
+            print(f"{len(remaining)} tracks are leased to other workers, checking again in {wait:.0f}s")
+            time.sleep(wait)
+    items_writer.close()
+    if http:
+        http.close()
+    if leases:
+        leases.close()
+    if leftover:
+        print(f"{leftover} tracks were not processed (driver setup failed)")
 
     print(f"Total new tracks processed: {completed_tracks}")
+    if failures:
+        print("Failed attempts: " + ', '.join(f"{kind} {count}" for kind, count in sorted(failures.items())) +
+              (f"; circuit opened {breaker.trips} times" if breaker.trips else ''))
+    if abandoned:
+        print(f"{len(abandoned)} tracks still failing after {MAX_ATTEMPTS} attempts: {', '.join(abandoned[:10])}")
+    if strategies:
+        print("Scrape strategies: " + ', '.join(f"{name} {count}" for name, count in sorted(strategies.items(), key=str)))
+    report_waits()
+    report_pages()
+    report_spans(os.path.join(base_dir, 'run_profile.json'))
 
     # Count final totals
-    try:
-        with open(items_csv, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            all_items = list(reader)
-            videos = [item for item in all_items if item.get('type') == 'video']
-            articles = [item for item in all_items if item.get('type') == 'article']
-            print(f"Final totals - Videos: {len(videos)}, Articles: {len(articles)}, Total items: {len(all_items)}")
-    except Exception as e:
-        print(f"Error reading final CSV: {e}")
+    counts = store.counts()
+    videos = sum(count for (item_type, _), count in counts.items() if item_type == 'video')
+    articles = sum(count for (item_type, _), count in counts.items() if item_type == 'article')
+    print(f"Final totals - Videos: {videos}, Articles: {articles}, Total items: {sum(counts.values())}")
+    if leases:
+        print(f"Run 'python course_scanner.py merge --shard-dir {SHARD_DIR}' once every worker has finished")
 
 def parse_course_overview_local(html_file):
     with open(html_file, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f.read(), 'lxml')
+        cards = parse_track_cards(f.read())
 
     tracks = []
 
-    track_items = soup.find_all('div', class_='batch_item__ndA6j')
-
-    for item in track_items:
-        track_data = {}
-
-        title_elem = item.find('p', class_='batch_title__XImuz')
-        if title_elem:
-            track_data['title'] = title_elem.get_text(strip=True)
-
-        link_elem = item.find_parent('a')
-        if link_elem and link_elem.get('href'):
-            track_data['url'] = link_elem['href']
-
-        meta_container = item.find('div', class_='batch_content_meta__8RbQN')
-        if meta_container:
-            metas = meta_container.find_all('p')
-            for meta in metas:
-                text = meta.get_text(strip=True)
-                if 'Videos' in text:
-                    track_data['videos'] = text
-                elif 'Articles' in text:
-                    track_data['articles'] = text
-                elif 'Problems' in text:
-                    track_data['problems'] = text
-                elif 'MCQ' in text:
-                    track_data['mcqs'] = text
+    for card in cards:
+        track_data = track_fields(card)
 
         if track_data:
             # Add default category/tab for local parsing
@@ -630,43 +1160,24 @@ def parse_course_overview_local(html_file):
 
 def parse_module_page_local(html_file):
     with open(html_file, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f.read(), 'lxml')
+        raw_items = parse_sidebar_items(f.read())
 
     items = []
 
-    sidebar_items = soup.find_all('a', class_=lambda x: x and 'sidebar_item__khyNp' in x)
-
-    for item in sidebar_items:
+    for raw in raw_items:
         item_data = {}
 
-        title_elem = item.find('p')
-        if title_elem:
-            item_data['title'] = title_elem.get_text(strip=True)
-
-        if item.get('href'):
-            item_data['url'] = item['href']
-
-        imgs = item.find_all('img')
-        for img in imgs:
-            src = img.get('src', '')
-            alt = img.get('alt', '')
-            if 'Article' in src or 'article' in alt.lower():
-                item_data['type'] = 'article'
-                break
-            elif 'Group11' in src or 'youtube' in src.lower() or 'video' in alt.lower():
-                item_data['type'] = 'video'
-                break
-
-        if not item_data.get('type'):
-            text_content = item.get_text().lower()
-            if 'duration' in text_content or 'min' in text_content:
-                item_data['type'] = 'video'
-            else:
-                item_data['type'] = 'article'
+        if raw['title'] is not None:
+            item_data['title'] = raw['title']
+
+        if raw['url']:
+            item_data['url'] = raw['url']
 
-        meta_elem = item.find('p', class_=lambda x: x and 'meta' in x)
-        if meta_elem:
-            item_data['meta'] = meta_elem.get_text(strip=True)
+        meta_text = raw['meta'] if raw['meta'] is not None else raw['text']
+        item_data['type'] = detect_item_type(raw['url'], raw['imgs'], meta_text, raw['alts'])
+
+        if raw['meta'] is not None:
+            item_data['meta'] = raw['meta']
 
         if item_data.get('title'):
             items.append(item_data)
@@ -674,4 +1185,71 @@ def parse_module_page_local(html_file):
     return items
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Scrape module items for every track in course_tracks.csv')
+    parser.add_argument('command', nargs='?', choices=['scrape', 'tracks', 'reparse', 'merge'], default='scrape',
+                        help="'tracks' rebuilds course_tracks.csv from the course overview, "
+                             "'reparse' rebuilds the CSVs from stored snapshots without a browser, "
+                             "'merge' folds the --shard-dir outputs of a sharded run into module_items.csv")
+    parser.add_argument('--workers', type=int, default=5, help='Number of long-lived browser workers to start with')
+    parser.add_argument('--min-workers', type=int, default=1, help='Floor for the adaptive worker count')
+    parser.add_argument('--max-workers', type=int,
+                        help='Ceiling for the adaptive worker count (default: max of --workers and CPU count)')
+    parser.add_argument('--fixed-workers', action='store_true', help='Always run exactly --workers workers')
+    parser.add_argument('--extraction', choices=['bulk', 'html', 'element', 'json'], default=EXTRACTION_MODE,
+                        help='How items are pulled out of the DOM')
+    parser.add_argument('--backend', choices=['browser', 'http'], default=FETCH_BACKEND,
+                        help='Fetch track pages with Chrome, or over HTTP with Chrome as fallback')
+    parser.add_argument('--browser-profile', choices=PROFILES, default=BROWSER_PROFILE,
+                        help='Chrome profile for scraping drivers; page weight and load time are reported per page')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Re-scrape only tracks whose advertised counts or card changed')
+    parser.add_argument('--snapshots', default='snapshots', help='Snapshot store directory')
+    parser.add_argument('--no-snapshots', action='store_true', help='Do not persist fetched page_source')
+    parser.add_argument('--shard-dir',
+                        help='Shared directory for a sharded run: tracks are claimed through leases there and each '
+                             'process writes its own items shard')
+    parser.add_argument('--worker-id', help='Name of this process in a sharded run (default: host-pid-random)')
+    parser.add_argument('--lease-ttl', type=float, default=LEASE_TTL,
+                        help="Seconds before a silent worker's track leases can be reclaimed")
+    args = parser.parse_args()
+    EXTRACTION_MODE = args.extraction
+    FETCH_BACKEND = args.backend
+    BROWSER_PROFILE = args.browser_profile
+    SHARD_DIR = args.shard_dir
+    WORKER_ID = args.worker_id
+    LEASE_TTL = args.lease_ttl
+    if args.command == 'merge' and not SHARD_DIR:
+        parser.error('merge needs --shard-dir')
+    if args.incremental and SHARD_DIR:
+        parser.error('--incremental cannot be combined with --shard-dir: removals are not merged')
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    snapshot_dir = os.path.join(base_dir, args.snapshots)
+    RECORDINGS_DIR = os.path.join(base_dir, 'recordings')
+    if args.command == 'tracks':
+        if not args.no_snapshots:
+            SNAPSHOT_STORE = SnapshotStore(snapshot_dir)
+        course_tracks, failed_views = scrape_course_tracks_parallel(COURSE_URL, num_workers=args.workers)
+        if failed_views:
+            # A partial list would drop whole categories from every later scan
+            print(f"course_tracks.csv left unchanged: {len(failed_views)} parts of the overview failed "
+                  f"({', '.join(failed_views[:10])})")
+        elif course_tracks:
+            save_tracks_csv(course_tracks, os.path.join(base_dir, 'course_tracks.csv'))
+    elif args.command == 'merge':
+        merge_item_shards(SHARD_DIR, os.path.join(base_dir, 'course_tracks.csv'),
+                          os.path.join(base_dir, 'module_items.csv'), os.path.join(base_dir, PROGRESS_DB))
+    elif args.command == 'reparse':
+        reparse_snapshots(SnapshotStore(snapshot_dir),
+                          os.path.join(base_dir, 'course_tracks.csv'),
+                          os.path.join(base_dir, 'module_items.csv'))
+    else:
+        if not args.no_snapshots:
+            SNAPSHOT_STORE = SnapshotStore(snapshot_dir)
+        install_queued_output()
+        try:
+            ceiling = None if args.fixed_workers else (args.max_workers or max(args.workers, os.cpu_count() or 1))
+            main(max_threads=args.workers, incremental=args.incremental, min_threads=args.min_workers,
+                 ceiling=ceiling)
+        finally:
+            stop_queued_output()
\ No newline at end of file
@@ -0,0 +1,84 @@
+import os
+import csv
+import time
+import queue
+import threading
+
+_CLOSE = object()
+
+
+class BatchedCsvWriter:
+    """Append rows to a CSV from a background thread.
+
+    Producers put rows on a bounded queue and return immediately. The writer
+    thread batches them, writing when batch_size rows are waiting or
+    flush_interval seconds have passed, and fsyncs after every batch so a
+    crash loses at most the batch in flight. The header is written only
+    when the file is empty.
+    """
+
+    def __init__(self, path, fieldnames, batch_size=100, flush_interval=2.0, max_queue=10000):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.rows_written = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def write(self, row):
+        self.queue.put(row)
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.queue.put(row)
+
+    def checkpoint(self):
+        """Block until everything queued so far is on disk"""
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        self.queue.put(_CLOSE)
+        self.thread.join()
+
+    def run(self):
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction='ignore')
+            if f.tell() == 0:
+                writer.writeheader()
+
+            batch = []
+            events = []
+            closing = False
+            deadline = time.time() + self.flush_interval
+
+            while not closing:
+                try:
+                    entry = self.queue.get(timeout=max(0, deadline - time.time()))
+                except queue.Empty:
+                    entry = None
+
+                if entry is _CLOSE:
+                    closing = True
+                elif isinstance(entry, threading.Event):
+                    events.append(entry)
+                elif entry is not None:
+                    batch.append(entry)
+
+                if closing or events or len(batch) >= self.batch_size or time.time() >= deadline:
+                    if batch:
+                        try:
+                            writer.writerows(batch)
+                            f.flush()
+                            os.fsync(f.fileno())
+                            self.rows_written += len(batch)
+                        except Exception as e:
+                            print(f"Error writing {len(batch)} rows to {self.path}: {e}")
+                        batch = []
+                    for event in events:
+                        event.set()
+                    events = []
+                    deadline = time.time() + self.flush_interval
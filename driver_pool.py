@@ -0,0 +1,149 @@
+import time
+import heapq
+import queue
+import threading
+
+# Returned by handle_task for a task it passed over without doing any work
+# (e.g. another process holds it); not counted towards the limiter's samples
+SKIPPED = object()
+
+
+class Requeue(Exception):
+    """Raised by handle_task to put its task at the back of the queue after `delay` seconds.
+
+    With restart_driver the worker quits its driver and starts a fresh one
+    before its next task.
+    """
+
+    def __init__(self, delay=0.0, restart_driver=False, reason=''):
+        super().__init__(reason)
+        self.delay = delay
+        self.restart_driver = restart_driver
+        self.reason = reason
+
+
+def run_driver_pool(tasks, handle_task, driver_factory, num_workers=5, limiter=None, breaker=None):
+    """Process tasks from a shared queue with num_workers long-lived drivers.
+
+    Each worker creates one driver, reuses it for every task it pulls off the
+    queue and quits it once the queue is drained. handle_task(driver, task)
+    does the actual work; returning False counts the task as failed,
+    returning SKIPPED leaves it out of the limiter's samples, and raising
+    Requeue schedules it again while other tasks carry on.
+
+    With an AdaptiveLimiter, num_workers is the most workers that may ever
+    run and the limiter decides how many run at once. A worker held back
+    while the limit is below the number of live drivers quits its driver.
+    With a CircuitBreaker, workers wait while it is open before taking a task.
+    """
+    task_queue = queue.Queue()
+    for task in tasks:
+        task_queue.put(task)
+
+    num_workers = max(1, min(num_workers, task_queue.qsize()))
+    live_drivers = [0]
+    live_lock = threading.Lock()
+
+    # Requeued tasks wait here until their backoff expires; in_flight counts
+    # tasks being handled, since any of them may still be requeued
+    delayed = []
+    in_flight = [0]
+    state_lock = threading.Lock()
+    sequence = [0]
+
+    def schedule(task, delay):
+        with state_lock:
+            sequence[0] += 1
+            heapq.heappush(delayed, (time.time() + delay, sequence[0], task))
+
+    def next_task():
+        """A ready task, or None once nothing is queued, delayed or in flight"""
+        while True:
+            with state_lock:
+                while delayed and delayed[0][0] <= time.time():
+                    task_queue.put(heapq.heappop(delayed)[2])
+                try:
+                    task = task_queue.get_nowait()
+                    in_flight[0] += 1
+                    return task
+                except queue.Empty:
+                    if not delayed and not in_flight[0]:
+                        return None
+                    wait = min(delayed[0][0] - time.time(), 0.5) if delayed else 0.5
+            time.sleep(max(0.01, wait))
+
+    def run_task(driver, task):
+        start = time.time()
+        result = False
+        try:
+            result = handle_task(driver, task)
+        finally:
+            if limiter and result is not SKIPPED:
+                limiter.record(time.time() - start, result is not False)
+
+    def worker(worker_id):
+        driver = None
+        try:
+            while True:
+                if breaker:
+                    breaker.wait()
+                if limiter and not limiter.acquire(timeout=1.0):
+                    with live_lock:
+                        if driver and live_drivers[0] > limiter.limit:
+                            driver.quit()
+                            driver = None
+                            live_drivers[0] -= 1
+                    with state_lock:
+                        if task_queue.empty() and not delayed and not in_flight[0]:
+                            break
+                    continue
+
+                try:
+                    task = next_task()
+                    if task is None:
+                        break
+
+                    try:
+                        if driver is None:
+                            driver = driver_factory()
+                            if not driver:
+                                print(f"Worker {worker_id}: failed to create driver")
+                                task_queue.put(task)
+                                return
+                            with live_lock:
+                                live_drivers[0] += 1
+
+                        run_task(driver, task)
+                    except Requeue as retry:
+                        if retry.restart_driver and driver:
+                            print(f"Worker {worker_id}: restarting driver ({retry.reason})")
+                            try:
+                                driver.quit()
+                            except Exception:
+                                pass
+                            driver = None
+                            with live_lock:
+                                live_drivers[0] -= 1
+                        schedule(task, retry.delay)
+                    except Exception as e:
+                        print(f"Worker {worker_id}: task failed: {e}")
+                    finally:
+                        with state_lock:
+                            in_flight[0] -= 1
+                finally:
+                    if limiter:
+                        limiter.release()
+        finally:
+            if driver:
+                driver.quit()
+
+    threads = []
+    for worker_id in range(num_workers):
+        thread = threading.Thread(target=worker, args=(worker_id + 1,), daemon=True)
+        threads.append(thread)
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return task_queue.qsize() + len(delayed)
@@ -0,0 +1,225 @@
+import re
+import csv
+import sys
+from urllib.parse import urljoin
+from lxml import etree
+from lxml import html as lxml_html
+
+from url_canon import read_item_rows
+
+
+def _has_class(class_name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+# Compiled once and shared by the live 'html' mode and the offline parsers
+TRACK_CARDS = etree.XPath(f"//*[{_has_class('batch_item__ndA6j')}]")
+CATEGORY_SECTIONS = etree.XPath(f"//*[{_has_class('batch_individual_tab__type___wbkY')}]")
+SECTION_CARDS = etree.XPath(f"descendant-or-self::*[{_has_class('batch_item__ndA6j')}]")
+CARD_TITLE = etree.XPath(f"(.//*[{_has_class('batch_title__XImuz')}])[1]")
+CARD_LINK = etree.XPath("ancestor::a[1]")
+CARD_METAS = etree.XPath(f"(.//*[{_has_class('batch_content_meta__8RbQN')}])[1]//p")
+
+SIDEBAR_ITEMS = etree.XPath(f"//*[{_has_class('sidebar_item__khyNp')}]")
+ITEM_TITLE = etree.XPath("(.//p)[1]")
+ITEM_META = etree.XPath(f"(.//*[{_has_class('sidebar_meta__9J4r4')}])[1]")
+IMGS = etree.XPath(".//img")
+
+SIDEBAR_TABS = etree.XPath(f"//*[{_has_class('sidebar_tabs__JmBlR')}]")
+TAB_LABEL = etree.XPath("(.//p)[1]")
+
+
+def _text(elem):
+    return ' '.join(elem.text_content().split())
+
+
+def _first(xpath, elem):
+    found = xpath(elem)
+    return found[0] if found else None
+
+
+def _href(elem, base_url):
+    href = elem.get('href')
+    if href and base_url:
+        return urljoin(base_url, href)
+    return href
+
+
+def parse_track_cards(page_html, base_url=None, section=None):
+    """Raw track cards: title, url, meta texts, img srcs and classes.
+
+    section limits them to the category section with that index, the way
+    the live scrape does; by default every card on the page is returned.
+    """
+    root = lxml_html.fromstring(page_html)
+    cards = []
+
+    if section is None:
+        elems = TRACK_CARDS(root)
+    else:
+        sections = CATEGORY_SECTIONS(root)
+        elems = SECTION_CARDS(sections[section]) if section < len(sections) else []
+
+    for elem in elems:
+        title = _first(CARD_TITLE, elem)
+        link = _first(CARD_LINK, elem)
+        cards.append({
+            'title': _text(title) if title is not None else None,
+            'url': _href(link, base_url) if link is not None else None,
+            'metas': [_text(p) for p in CARD_METAS(elem)],
+            'imgs': [img.get('src', '') for img in IMGS(elem)],
+            'classes': elem.get('class', ''),
+        })
+
+    return cards
+
+
+def parse_sidebar_items(page_html, base_url=None):
+    """Raw sidebar items: title, url, img srcs/alts, meta text, full text and classes"""
+    root = lxml_html.fromstring(page_html)
+    items = []
+
+    for elem in SIDEBAR_ITEMS(root):
+        title = _first(ITEM_TITLE, elem)
+        meta = _first(ITEM_META, elem)
+        imgs = IMGS(elem)
+        items.append({
+            'title': _text(title) if title is not None else None,
+            'url': _href(elem, base_url),
+            'imgs': [img.get('src', '') for img in imgs],
+            'alts': [img.get('alt', '') for img in imgs],
+            'meta': _text(meta) if meta is not None else None,
+            'text': _text(elem),
+            'classes': elem.get('class', ''),
+        })
+
+    return items
+
+
+def parse_sidebar_tab_labels(page_html):
+    """Lowercased sidebar tab labels, e.g. ['all (12)', 'videos (7)', 'articles (5)']"""
+    labels = []
+    for tab in SIDEBAR_TABS(lxml_html.fromstring(page_html)):
+        label = _first(TAB_LABEL, tab)
+        labels.append(_text(label if label is not None else tab).lower())
+    return labels
+
+
+def track_fields(card):
+    """Map a raw track card onto the course_tracks.csv columns"""
+    track_data = {}
+
+    if card['title'] is not None:
+        track_data['title'] = card['title'].strip()
+    if card['url']:
+        track_data['url'] = card['url']
+
+    for text in card['metas']:
+        text = text.strip()
+        if 'Videos' in text:
+            track_data['videos'] = text
+        elif 'Articles' in text:
+            track_data['articles'] = text
+        elif 'Problems' in text:
+            track_data['problems'] = text
+        elif 'MCQ' in text:
+            track_data['mcqs'] = text
+
+    return track_data
+
+
+# Item type rules, tried in order; the first rule whose pattern matches its field wins.
+# 'segment' is the URL path segment naming the item kind (.../track/<slug>/video/<id>),
+# 'img' each img src, 'alt' each img alt, 'meta' the sidebar meta text.
+ITEM_TYPE_RULES = [(field, re.compile(pattern, re.IGNORECASE), item_type) for field, pattern, item_type in [
+    ('segment', r'^video$', 'video'),
+    ('segment', r'^article$', 'article'),
+    ('segment', r'^problem$', 'problem'),
+    ('segment', r'^quiz$', 'quiz'),
+    ('img', r'youtube|video|Group11', 'video'),
+    ('img', r'article|book', 'article'),
+    ('alt', r'video', 'video'),
+    ('alt', r'article', 'article'),
+    ('meta', r'Duration|\b\d+\s*(min|sec)', 'video'),
+    ('meta', r'Last Updated', 'article'),
+    ('meta', r'Accuracy', 'problem'),
+]]
+ITEM_KIND_SEGMENT = re.compile(r'/track/[^/]+/([^/]+)/')
+
+
+def url_kind_segment(url):
+    """'video' for .../track/<slug>/video/<id>, or '' when the URL does not name a kind"""
+    match = ITEM_KIND_SEGMENT.search(url or '')
+    return match.group(1) if match else ''
+
+
+def detect_item_type(url, img_srcs=(), meta_text=None, img_alts=()):
+    """Classify an item from already-extracted fields with ITEM_TYPE_RULES; 'unknown' if nothing matches"""
+    fields = {'segment': [url_kind_segment(url)], 'img': img_srcs, 'alt': img_alts,
+              'meta': [meta_text] if meta_text else []}
+    for field, pattern, item_type in ITEM_TYPE_RULES:
+        if any(pattern.search(value) for value in fields[field] if value):
+            return item_type
+    return 'unknown'
+
+
+def sidebar_item_fields(raw, expected_type=None):
+    """Map a raw sidebar item onto the module_items.csv columns, or None if incomplete"""
+    if raw['title'] is None:
+        return None
+
+    item_data = {'title': raw['title'].strip(), 'url': raw['url']}
+    meta_text = raw['meta'].strip() if raw['meta'] is not None else None
+
+    if expected_type:
+        item_data['type'] = expected_type
+    else:
+        item_data['type'] = detect_item_type(raw['url'], raw['imgs'], meta_text, raw.get('alts', ()))
+
+    if meta_text is not None:
+        item_data['meta'] = meta_text
+
+    if item_data.get('title') and item_data.get('url'):
+        return item_data
+    return None
+
+
+def build_type_corpus(items_csv='module_items.csv', corpus_csv='item_type_corpus.csv'):
+    """Freeze the classifier's expected answers for every scraped item into a regression corpus.
+
+    Each item is recorded twice: with its URL, and with only its meta text so
+    the meta rules are exercised on their own. Items filed under the Videos tab
+    whose URL is a /problem/ page are expected to classify as 'problem'.
+    """
+    cases = []
+    seen_meta = set()
+    for row in read_item_rows(items_csv):
+        expected = 'problem' if url_kind_segment(row['url']) == 'problem' else row['type']
+        cases.append({'url': row['url'], 'meta': row.get('meta', ''), 'type': expected})
+        if row.get('meta') and row['meta'] not in seen_meta:
+            seen_meta.add(row['meta'])
+            cases.append({'url': '', 'meta': row['meta'], 'type': expected})
+
+    with open(corpus_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=['url', 'meta', 'type'])
+        writer.writeheader()
+        writer.writerows(cases)
+    return len(cases)
+
+
+def check_type_corpus(corpus_csv='item_type_corpus.csv'):
+    """Cases in the corpus that detect_item_type no longer classifies as recorded"""
+    with open(corpus_csv, 'r', newline='', encoding='utf-8') as csvfile:
+        return [(case, detect_item_type(case['url'], meta_text=case['meta']))
+                for case in csv.DictReader(csvfile)
+                if detect_item_type(case['url'], meta_text=case['meta']) != case['type']]
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['build-corpus']:
+        print(f"Wrote {build_type_corpus()} classifier cases to item_type_corpus.csv")
+    else:
+        failures = check_type_corpus()
+        for case, got in failures[:20]:
+            print(f"  expected {case['type']}, got {got}: {case['url'] or case['meta']}")
+        print(f"{len(failures)} classifier regressions")
+        sys.exit(1 if failures else 0)
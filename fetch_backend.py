@@ -0,0 +1,76 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from session import BASE_URL, read_cookies
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+
+
+class HttpFetcher:
+    """Keep-alive HTTP client carrying the saved cookie jar, shared by all workers"""
+
+    def __init__(self, cookies_file='cookies.json', pool_size=10, timeout=15):
+        self.cookies_file = cookies_file
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.load_cookies()
+
+    def load_cookies(self):
+        for cookie in read_cookies(self.cookies_file):
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain'), path=cookie.get('path', '/')
+            )
+
+    def fetch(self, url):
+        """Return the page HTML, or None if the request failed.
+
+        Raw server HTML mentions logging in on pages that are fine, so a login
+        page is not judged here: it lacks the marker needs_browser() looks for,
+        and the browser fallback decides whether the session is logged out.
+        """
+        if not url.startswith('http'):
+            url = f"{BASE_URL}{url}"
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"HTTP fetch failed for {url}: {e}")
+            return None
+
+        if response.status_code != 200:
+            return None
+        return response.text
+
+    def close(self):
+        self.session.close()
+
+
+class FallbackFetcher:
+    """Per-worker fetcher: plain HTTP first, a lazily started browser only when needed"""
+
+    def __init__(self, http, driver_factory):
+        self.http = http
+        self.driver_factory = driver_factory
+        self._driver = None
+        self.browser_fetches = 0
+        self.http_fetches = 0
+
+    def driver(self):
+        if self._driver is None:
+            self._driver = self.driver_factory()
+        return self._driver
+
+    def quit(self):
+        if self._driver:
+            self._driver.quit()
+            self._driver = None
+
+
+def needs_browser(page_html, required_marker):
+    """True when the server-rendered HTML lacks the content we scrape (a JS-only page)"""
+    return page_html is None or required_marker not in page_html
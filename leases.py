@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import uuid
+import socket
+import hashlib
+import threading
+
+
+def worker_id():
+    """host-pid-random: unique across hosts and restarts, and safe in a file name"""
+    host = ''.join(c if c.isalnum() or c in '-_' else '-' for c in socket.gethostname()) or 'host'
+    return f"{host}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class LeaseStore:
+    """Hand work items out to processes on one or more hosts through files in a shared directory.
+
+    claim(key) creates <root>/<hash>.lease with O_EXCL, so exactly one process
+    wins a free key. The lease names its owner and an expiry that a heartbeat
+    thread pushes forward while the owner is alive; when a worker dies its
+    leases expire and the next claim takes them over. complete(key) leaves a
+    .done marker that later claims skip. Expiry compares wall clocks, so
+    hosts must agree on the time to well within ttl.
+    """
+
+    def __init__(self, root, ttl=300.0, owner=None):
+        self.root = root
+        self.ttl = ttl
+        self.owner = owner or worker_id()
+        self.held = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.heartbeat = None
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key, suffix):
+        return os.path.join(self.root, hashlib.sha1(key.encode('utf-8')).hexdigest() + suffix)
+
+    def read(self, path):
+        """The lease at path, or None if there is none"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Its creator is still writing it; treat it as fresh
+            try:
+                return {'owner': None, 'expires': os.path.getmtime(path) + self.ttl}
+            except OSError:
+                return None
+
+    def write_new(self, path, key):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'owner': self.owner, 'expires': time.time() + self.ttl}, f)
+        return True
+
+    def take_over(self, path):
+        """Move an expired lease out of the way; False if another worker renewed or replaced it first"""
+        stale = f"{path}.{self.owner}.stale"
+        try:
+            os.rename(path, stale)
+        except FileNotFoundError:
+            return False
+        moved = self.read(stale)
+        if moved and moved['expires'] > time.time():
+            # Someone else's fresh lease landed there between our read and the rename: put it back
+            try:
+                os.link(stale, path)
+            except OSError:
+                pass
+            os.remove(stale)
+            return False
+        os.remove(stale)
+        return True
+
+    def claim(self, key):
+        """True if this process now holds key; False if it is done or leased to a live worker"""
+        with self.lock:
+            if key in self.held:
+                return True
+        if self.is_done(key):
+            return False
+
+        path = self.path(key, '.lease')
+        if not self.write_new(path, key):
+            lease = self.read(path)
+            if lease and lease['expires'] > time.time():
+                return False
+            if lease:
+                if not self.take_over(path):
+                    return False
+                print(f"Reclaiming expired lease on {key} from {lease.get('owner')}")
+            if not self.write_new(path, key):
+                return False
+
+        # Completed by its previous owner while we were claiming it
+        if self.is_done(key):
+            os.remove(path)
+            return False
+        with self.lock:
+            self.held.add(key)
+        return True
+
+    def release(self, key):
+        """Give key up without completing it, so another worker may claim it"""
+        # Under the lock so a heartbeat cannot write the lease back after it is removed
+        with self.lock:
+            self.held.discard(key)
+            path = self.path(key, '.lease')
+            lease = self.read(path)
+            if lease and lease.get('owner') == self.owner:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def complete(self, key):
+        with open(self.path(key, '.done'), 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'owner': self.owner, 'completed_at': time.time()}, f)
+        self.release(key)
+
+    def is_done(self, key):
+        return os.path.exists(self.path(key, '.done'))
+
+    def expires_in(self, keys):
+        """Seconds until the first lease on any of keys runs out (0 if one is already free)"""
+        remaining = []
+        for key in keys:
+            lease = self.read(self.path(key, '.lease'))
+            remaining.append(max(0.0, lease['expires'] - time.time()) if lease else 0.0)
+        return min(remaining, default=0.0)
+
+    def renew(self):
+        """Push the expiry of every held lease ttl seconds ahead"""
+        with self.lock:
+            keys = list(self.held)
+        for key in keys:
+            with self.lock:
+                # Released or completed since the snapshot above
+                if key not in self.held:
+                    continue
+                path = self.path(key, '.lease')
+                lease = self.read(path)
+                if not lease or lease.get('owner') != self.owner:
+                    print(f"Lease on {key} was taken over by {lease.get('owner') if lease else 'nobody'}")
+                    self.held.discard(key)
+                    continue
+                temp = f"{path}.{self.owner}.tmp"
+                with open(temp, 'w', encoding='utf-8') as f:
+                    json.dump({'key': key, 'owner': self.owner, 'expires': time.time() + self.ttl}, f)
+                os.replace(temp, path)
+
+    def start(self):
+        """Renew held leases every ttl/3 seconds until close()"""
+        def beat():
+            while not self.stopped.wait(self.ttl / 3):
+                try:
+                    self.renew()
+                except OSError as e:
+                    print(f"Lease renewal failed: {e}")
+
+        self.heartbeat = threading.Thread(target=beat, daemon=True)
+        self.heartbeat.start()
+        return self
+
+    def close(self):
+        """Stop the heartbeat and release every lease still held"""
+        self.stopped.set()
+        if self.heartbeat:
+            self.heartbeat.join()
+        with self.lock:
+            keys = list(self.held)
+        for key in keys:
+            self.release(key)
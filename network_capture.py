@@ -0,0 +1,316 @@
+import os
+import sys
+import json
+import base64
+import hashlib
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+from urllib.parse import quote, urlsplit
+
+# Keys that mark a JSON object as a sidebar item, and how they map to item types
+ITEM_TYPE_KEYS = {
+    'video': 'video', 'videos': 'video', 'video_id': 'video',
+    'article': 'article', 'articles': 'article', 'article_id': 'article',
+    'quiz': 'quiz', 'quiz_id': 'quiz', 'question_id': 'quiz',
+}
+TITLE_KEYS = ('title', 'name', 'heading')
+ID_KEYS = ('id', 'video_id', 'article_id', 'quiz_id', 'question_id')
+TYPE_KEYS = ('type', 'content_type', 'item_type', 'contentType', 'itemType')
+DURATION_KEYS = ('duration', 'video_duration', 'length')
+UPDATED_KEYS = ('updated_at', 'last_updated', 'modified_at')
+
+# Recorded responses for one track plus the items the DOM scraper saved for it;
+# `python network_capture.py` replays them through a stub server and compares
+CAPTURE_FIXTURE = 'json_capture_fixture.json'
+FIXTURE_TRACK = 'foundation-cpp-io-in-cpp-2'
+
+
+def enable_performance_logging(options):
+    """Ask chromedriver to buffer DevTools network events for get_log('performance')"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def drain_performance_log(driver):
+    try:
+        driver.get_log('performance')
+    except Exception:
+        pass
+
+
+def collect_json_responses(driver, pending=None):
+    """JSON responses whose bodies finished loading since the last call, as [{'url', 'status', 'body'}]
+
+    A body can only be fetched after its Network.loadingFinished event, which
+    may arrive in a later drain than Network.responseReceived. Pass the same
+    `pending` dict on every call of one capture so those are fetched then.
+    """
+    if pending is None:
+        pending = {}
+    responses = []
+    try:
+        entries = driver.get_log('performance')
+    except Exception as e:
+        print(f"Performance log unavailable: {e}")
+        return responses
+
+    finished = []
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.responseReceived':
+            if 'json' in params['response'].get('mimeType', ''):
+                pending[params['requestId']] = params['response']
+        elif method == 'Network.loadingFinished' and params.get('requestId') in pending:
+            finished.append((params['requestId'], pending.pop(params['requestId'])))
+        elif method == 'Network.loadingFailed':
+            pending.pop(params.get('requestId'), None)
+
+    for request_id, response in finished:
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            body = result['body']
+            if result.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8')
+            responses.append({'url': response['url'], 'status': response.get('status'), 'body': json.loads(body)})
+        except Exception as e:
+            print(f"Could not read JSON body of {response['url']}: {e}")
+
+    return responses
+
+
+def recording_path(directory, url):
+    parts = urlsplit(url)
+    key = hashlib.sha1(f"{parts.path}?{parts.query}".encode('utf-8')).hexdigest()
+    return os.path.join(directory, f"{key}.json")
+
+
+def save_recordings(responses, directory='recordings'):
+    os.makedirs(directory, exist_ok=True)
+    for response in responses:
+        with open(recording_path(directory, response['url']), 'w', encoding='utf-8') as f:
+            json.dump(response, f)
+
+
+def load_recordings(directory='recordings'):
+    responses = []
+    if not os.path.isdir(directory):
+        return responses
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                responses.append(json.load(f))
+    return responses
+
+
+def encode_item_id(item_id):
+    """Item ids appear in URLs as percent-encoded base64, e.g. 2389 -> MjM4OQ%3D%3D"""
+    return quote(base64.b64encode(str(item_id).encode('utf-8')).decode('ascii'), safe='')
+
+
+def _item_type(obj, parent_key):
+    for key in TYPE_KEYS:
+        value = obj.get(key)
+        if isinstance(value, str) and value.lower() in ITEM_TYPE_KEYS:
+            return ITEM_TYPE_KEYS[value.lower()]
+    for key in ID_KEYS[1:]:
+        if key in obj:
+            return ITEM_TYPE_KEYS[key]
+    if parent_key and parent_key.lower() in ITEM_TYPE_KEYS:
+        return ITEM_TYPE_KEYS[parent_key.lower()]
+    return None
+
+
+def _duration_meta(obj):
+    for key in DURATION_KEYS:
+        value = obj.get(key)
+        if isinstance(value, (int, float)) and value > 0:
+            minutes, seconds = divmod(int(value), 60)
+            # Same wording as the rendered sidebar, which says "1 minute" but "5 min"
+            return f"Duration: {minutes} {'minute' if minutes == 1 else 'min'}, {seconds} sec"
+        if isinstance(value, str) and value:
+            return f"Duration: {value}"
+    for key in UPDATED_KEYS:
+        value = obj.get(key)
+        if isinstance(value, str) and value:
+            return f"Last Updated: {value[:10]}"
+    return None
+
+
+def track_base_url(track_url):
+    """.../track/<slug> for any URL inside a track, including one that already points at an item"""
+    prefix, sep, rest = track_url.partition('/track/')
+    if not sep:
+        return track_url.rstrip('/')
+    return f"{prefix}/track/{rest.split('/')[0].split('?')[0]}"
+
+
+def items_from_json(payload, track_url, parent_key=None):
+    """Walk a JSON payload and build module items from objects that look like sidebar entries"""
+    items = []
+
+    if isinstance(payload, list):
+        for value in payload:
+            items.extend(items_from_json(value, track_url, parent_key))
+        return items
+
+    if not isinstance(payload, dict):
+        return items
+
+    title = next((payload[k] for k in TITLE_KEYS if isinstance(payload.get(k), str)), None)
+    item_id = next((payload[k] for k in ID_KEYS if isinstance(payload.get(k), (int, str))), None)
+    item_type = _item_type(payload, parent_key)
+
+    if title and item_id is not None and item_type:
+        item_data = {
+            'type': item_type,
+            'title': title.strip(),
+            'url': f"{track_url.rstrip('/')}/{item_type}/{encode_item_id(item_id)}",
+        }
+        meta = _duration_meta(payload)
+        if meta:
+            item_data['meta'] = meta
+        items.append(item_data)
+
+    for key, value in payload.items():
+        if isinstance(value, (dict, list)):
+            items.extend(items_from_json(value, track_url, key))
+
+    return items
+
+
+def items_from_responses(responses, track_url):
+    """Items from all captured responses, deduplicated by URL in capture order"""
+    items = []
+    seen_urls = set()
+    track_url = track_base_url(track_url)
+    for response in responses:
+        for item in items_from_json(response['body'], track_url):
+            if item['url'] not in seen_urls:
+                seen_urls.add(item['url'])
+                items.append(item)
+    return items
+
+
+def build_capture_fixture(items_csv='module_items.csv', path=CAPTURE_FIXTURE, track=FIXTURE_TRACK):
+    """Write API-style responses for one track, rebuilt from the items the DOM scraper saved for it"""
+    from url_canon import decode_item_id, read_item_rows
+
+    marker = f"/track/{track}/"
+    rows = [row for row in read_item_rows(items_csv) if marker in row['url']]
+    track_url = rows[0]['url'].split(marker)[0] + marker.rstrip('/')
+    api_url = track_url.replace('/batch/', '/api/batch/')
+
+    contents = []
+    for row in rows:
+        entry = {'id': int(decode_item_id(row['url'].rstrip('/').rsplit('/', 1)[1].replace('%3D', '='))),
+                 'title': row['title'], 'type': row['type']}
+        meta = row.get('meta') or ''
+        if meta.startswith('Duration:'):
+            numbers = [int(part.split()[0]) for part in meta[len('Duration:'):].split(',')]
+            entry['duration'] = numbers[0] * 60 + numbers[1]
+        elif meta.startswith('Last Updated:'):
+            entry['updated_at'] = meta[len('Last Updated:'):].strip() + 'T00:00:00Z'
+        contents.append(entry)
+
+    responses = [
+        {'url': f"{api_url}/contents", 'status': 200, 'body': {'data': {'track': track, 'contents': contents}}},
+        # The per-type endpoint repeats the videos; they must not be duplicated
+        {'url': f"{api_url}/contents?type=video", 'status': 200,
+         'body': {'videos': [entry for entry in contents if entry['type'] == 'video']}},
+        # Unrelated calls on the same page build no items
+        {'url': track_url.split('/batch/')[0] + '/api/user/profile', 'status': 200,
+         'body': {'id': 7, 'name': 'Student', 'batches': [{'id': 12, 'name': 'DSA JIIT'}]}},
+    ]
+    expected = [{'type': row['type'], 'title': row['title'], 'url': row['url'], 'meta': row.get('meta', '')}
+                for row in rows]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'track_url': track_url, 'responses': responses, 'expected': expected}, f, indent=1)
+    return len(responses), len(expected)
+
+
+class _FakePerformanceLog:
+    """Stands in for a driver: each get_log call returns the next batch of DevTools events"""
+
+    def __init__(self, batches, bodies):
+        self.batches = list(batches)
+        self.bodies = bodies
+
+    def get_log(self, name):
+        return self.batches.pop(0) if self.batches else []
+
+    def execute_cdp_cmd(self, command, params):
+        if params['requestId'] not in self.bodies:
+            raise RuntimeError('No data found for resource with given identifier')
+        return {'body': self.bodies[params['requestId']], 'base64Encoded': False}
+
+
+def _event(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+def check_capture_fixture(path=CAPTURE_FIXTURE):
+    """Replay the fixture through the stub server and the DevTools event path; returns a list of problems"""
+    from replay_server import make_replay_handler
+
+    with open(path, encoding='utf-8') as f:
+        fixture = json.load(f)
+    problems = []
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_replay_handler(fixture['responses']))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        replayed = []
+        for recorded in fixture['responses']:
+            parts = urlsplit(recorded['url'])
+            with urllib.request.urlopen(f"{base_url}{parts.path}?{parts.query}") as reply:
+                replayed.append({'url': recorded['url'], 'status': reply.status, 'body': json.load(reply)})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Bodies finish loading one drain after their headers arrive, as on a slow page
+    batches, bodies = [[], []], {}
+    for i, response in enumerate(replayed):
+        request_id = f"req-{i}"
+        batches[0].append(_event('Network.responseReceived', requestId=request_id,
+                                 response={'url': response['url'], 'status': 200, 'mimeType': 'application/json'}))
+        batches[1].append(_event('Network.loadingFinished', requestId=request_id))
+        bodies[request_id] = json.dumps(response['body'])
+    driver = _FakePerformanceLog(batches, bodies)
+    pending = {}
+    captured = collect_json_responses(driver, pending) + collect_json_responses(driver, pending)
+    if len(captured) != len(replayed):
+        problems.append(f"captured {len(captured)} of {len(replayed)} responses from the performance log")
+
+    items = items_from_responses(captured, fixture['track_url'])
+    got = [{'type': item['type'], 'title': item['title'], 'url': item['url'], 'meta': item.get('meta', '')}
+           for item in items]
+    for i, (want, have) in enumerate(zip(fixture['expected'], got)):
+        if want != have:
+            problems.append(f"item {i}: expected {want}, got {have}")
+    if len(got) != len(fixture['expected']):
+        problems.append(f"expected {len(fixture['expected'])} items, got {len(got)}")
+
+    # Some course_tracks.csv rows link straight to a track's first video
+    item_url = fixture['expected'][0]['url']
+    if items_from_responses(captured, item_url) != items:
+        problems.append(f"items built for {item_url} differ from those for {fixture['track_url']}")
+    return problems
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['build-fixture']:
+        responses, items = build_capture_fixture()
+        print(f"Wrote {responses} recorded responses and {items} expected items to {CAPTURE_FIXTURE}")
+    else:
+        problems = check_capture_fixture()
+        for problem in problems[:20]:
+            print(f"  {problem}")
+        print(f"{len(problems)} JSON capture problems")
+        sys.exit(1 if problems else 0)
@@ -0,0 +1,416 @@
+import io
+import os
+import csv
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+
+from url_canon import canonical_key, item_rows
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    url TEXT PRIMARY KEY,
+    canonical_key TEXT,
+    track_slug TEXT,
+    type TEXT,
+    title TEXT,
+    meta TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    created_at TEXT,
+    updated_at TEXT,
+    completed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_items_track_slug ON items(track_slug);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_items_canonical_key ON items(canonical_key);
+CREATE INDEX IF NOT EXISTS idx_items_type_status ON items(type, status);
+
+CREATE TABLE IF NOT EXISTS tracks (
+    slug TEXT PRIMARY KEY,
+    title TEXT,
+    url TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    item_count INTEGER NOT NULL DEFAULT 0,
+    card_fingerprint TEXT,
+    item_fingerprint TEXT,
+    strategy TEXT,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    imported_at TEXT,
+    imported_bytes INTEGER,
+    head_digest TEXT,
+    tail_digest TEXT
+);
+"""
+
+
+# Columns added to existing tables after their first release
+ADDED_TRACK_COLUMNS = [('card_fingerprint', 'TEXT'), ('item_fingerprint', 'TEXT'), ('strategy', 'TEXT')]
+ADDED_IMPORT_COLUMNS = [('imported_bytes', 'INTEGER'), ('head_digest', 'TEXT'), ('tail_digest', 'TEXT')]
+
+# Bytes hashed at the start and at the end of the imported part of a CSV to tell an append from a rewrite
+IMPORT_CHECK_BYTES = 65536
+
+
+def now():
+    return time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _digest(f, start, end):
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+def track_slug_from_url(url):
+    """TRACK-NAME from /batch/dsa-jiit/track/TRACK-NAME/..., or None"""
+    url_parts = (url or '').split('/')
+    try:
+        track_index = url_parts.index('track')
+    except ValueError:
+        return None
+    if track_index < len(url_parts) - 1:
+        return url_parts[track_index + 1]
+    return None
+
+
+class ProgressStore:
+    """SQLite-backed progress for scraped items, tracks and completed articles.
+
+    Each thread gets its own connection; WAL mode plus IMMEDIATE transactions
+    let many threads or processes upsert without a process-local lock.
+    """
+
+    def __init__(self, db_path='progress.db'):
+        self.db_path = db_path
+        self.local = threading.local()
+        self.migrate()
+        self.connection().executescript(SCHEMA)
+
+    def migrate(self):
+        """Bring stores created by earlier versions up to the current schema"""
+        conn = self.connection()
+        track_columns = [row[1] for row in conn.execute("PRAGMA table_info(tracks)")]
+        for column, column_type in ADDED_TRACK_COLUMNS:
+            if track_columns and column not in track_columns:
+                conn.execute(f"ALTER TABLE tracks ADD COLUMN {column} {column_type}")
+        import_columns = [row[1] for row in conn.execute("PRAGMA table_info(imports)")]
+        for column, column_type in ADDED_IMPORT_COLUMNS:
+            if import_columns and column not in import_columns:
+                conn.execute(f"ALTER TABLE imports ADD COLUMN {column} {column_type}")
+
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(items)")]
+        if columns and 'canonical_key' not in columns:
+            self.backfill_canonical_keys()
+
+    def backfill_canonical_keys(self):
+        """Add canonical_key to items, merging rows that are the same item under different URLs"""
+        with self.transaction() as conn:
+            conn.execute("ALTER TABLE items ADD COLUMN canonical_key TEXT")
+            rows = conn.execute("SELECT rowid, url, status, completed_at FROM items ORDER BY rowid").fetchall()
+            first_by_key = {}
+            for rowid, url, status, completed_at in rows:
+                key = canonical_key(url)
+                if key not in first_by_key:
+                    first_by_key[key] = rowid
+                    conn.execute("UPDATE items SET canonical_key = ? WHERE rowid = ?", (key, rowid))
+                    continue
+                # Same item under another spelling: keep the first row, carrying over completion
+                if status == 'completed':
+                    conn.execute("UPDATE items SET status = 'completed', completed_at = ? WHERE rowid = ?",
+                                 (completed_at, first_by_key[key]))
+                conn.execute("DELETE FROM items WHERE rowid = ?", (rowid,))
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def transaction(self):
+        return _Transaction(self.connection())
+
+    def upsert_items(self, items, track_slug=None, status=None):
+        timestamp = now()
+        rows = [(item['url'], canonical_key(item['url']), track_slug or track_slug_from_url(item['url']),
+                 item.get('type'), item.get('title'), item.get('meta'), status or 'pending', timestamp, timestamp)
+                for item in items if item.get('url')]
+        with self.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO items (url, canonical_key, track_slug, type, title, meta, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(canonical_key) DO UPDATE SET
+                    track_slug = COALESCE(excluded.track_slug, items.track_slug),
+                    type = excluded.type,
+                    title = excluded.title,
+                    meta = COALESCE(excluded.meta, items.meta),
+                    status = CASE WHEN items.status = 'removed' THEN 'pending' ELSE items.status END,
+                    updated_at = excluded.updated_at
+            """, rows)
+        return len(rows)
+
+    def mark_completed(self, url, title=None, item_type='article', completed_at=None):
+        timestamp = now()
+        completed_at = completed_at or timestamp
+        with self.transaction() as conn:
+            conn.execute("""
+                INSERT INTO items (url, canonical_key, track_slug, type, title, status, created_at, updated_at, completed_at)
+                VALUES (?, ?, ?, ?, ?, 'completed', ?, ?, ?)
+                ON CONFLICT(canonical_key) DO UPDATE SET
+                    status = 'completed',
+                    updated_at = excluded.updated_at,
+                    completed_at = excluded.completed_at
+            """, (url, canonical_key(url), track_slug_from_url(url), item_type, title, timestamp, timestamp, completed_at))
+        return completed_at
+
+    def set_status(self, url, status, title=None, item_type=None):
+        """Record a non-completion outcome (e.g. 'failed') for one item, creating the row if needed"""
+        timestamp = now()
+        with self.transaction() as conn:
+            conn.execute("""
+                INSERT INTO items (url, canonical_key, track_slug, type, title, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(canonical_key) DO UPDATE SET
+                    status = excluded.status,
+                    updated_at = excluded.updated_at
+            """, (url, canonical_key(url), track_slug_from_url(url), item_type, title, status, timestamp, timestamp))
+
+    def new_items(self, items):
+        """Items whose canonical key is in neither the store nor earlier in `items`"""
+        keys = [canonical_key(item['url']) for item in items]
+        known = set()
+        conn = self.connection()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            known.update(row[0] for row in conn.execute(
+                f"SELECT canonical_key FROM items WHERE canonical_key IN ({placeholders})", chunk))
+
+        fresh = []
+        for key, item in zip(keys, items):
+            if key not in known:
+                known.add(key)
+                fresh.append(item)
+        return fresh
+
+    def is_completed(self, url):
+        row = self.connection().execute(
+            "SELECT 1 FROM items WHERE canonical_key = ? AND status = 'completed'", (canonical_key(url),)).fetchone()
+        return row is not None
+
+    def processed_track_slugs(self):
+        conn = self.connection()
+        slugs = {row[0] for row in conn.execute("SELECT slug FROM tracks WHERE status = 'done'")}
+        slugs.update(row[0] for row in conn.execute(
+            "SELECT DISTINCT track_slug FROM items WHERE track_slug IS NOT NULL"))
+        return slugs
+
+    def pending_items(self, item_type='article'):
+        rows = self.connection().execute(
+            "SELECT * FROM items WHERE type = ? AND status NOT IN ('completed', 'removed') ORDER BY rowid",
+            (item_type,))
+        return [dict(row) for row in rows]
+
+    def track_state(self, slug):
+        row = self.connection().execute("SELECT * FROM tracks WHERE slug = ?", (slug,)).fetchone()
+        return dict(row) if row else None
+
+    def item_counts_by_track(self):
+        """{track_slug: {type: count}} over items that are still listed on their track"""
+        counts = {}
+        for slug, item_type, count in self.connection().execute(
+                "SELECT track_slug, type, COUNT(*) FROM items WHERE status != 'removed' GROUP BY track_slug, type"):
+            counts.setdefault(slug, {})[item_type] = count
+        return counts
+
+    def set_card_fingerprint(self, slug, title, url, card_fingerprint):
+        with self.transaction() as conn:
+            conn.execute("""
+                INSERT INTO tracks (slug, title, url, status, card_fingerprint, updated_at)
+                VALUES (?, ?, ?, 'done', ?, ?)
+                ON CONFLICT(slug) DO UPDATE SET card_fingerprint = excluded.card_fingerprint,
+                                                updated_at = excluded.updated_at
+            """, (slug, title, url, card_fingerprint, now()))
+
+    def apply_track_scan(self, slug, title, url, items, card_fingerprint=None, strategy=None):
+        """Replace a track's item list with a fresh scrape.
+
+        New items are inserted, known ones refreshed, and pending items of the
+        scanned types that are no longer listed are marked 'removed'; other
+        rows filed under the track (e.g. quizzes) are left alone. strategy
+        records how the items were scraped. Returns (added, removed).
+        """
+        keys = {canonical_key(item['url']) for item in items}
+        types = sorted({item['type'] for item in items if item.get('type')})
+        item_fingerprint = hashlib.sha1('\n'.join(sorted(keys)).encode('utf-8')).hexdigest()
+        added = self.new_items(items)
+        self.upsert_items(items, slug)
+
+        timestamp = now()
+        with self.transaction() as conn:
+            placeholders = ','.join('?' * len(types))
+            listed = conn.execute(f"""
+                SELECT canonical_key FROM items
+                WHERE track_slug = ? AND status = 'pending' AND type IN ({placeholders})
+            """, [slug] + types).fetchall()
+            removed = [row[0] for row in listed if row[0] not in keys]
+            conn.executemany("UPDATE items SET status = 'removed', updated_at = ? WHERE canonical_key = ?",
+                             [(timestamp, key) for key in removed])
+            conn.execute("""
+                INSERT INTO tracks (slug, title, url, status, item_count, card_fingerprint, item_fingerprint, strategy,
+                                    updated_at)
+                VALUES (?, ?, ?, 'done', ?, ?, ?, ?, ?)
+                ON CONFLICT(slug) DO UPDATE SET
+                    title = excluded.title,
+                    url = excluded.url,
+                    status = 'done',
+                    item_count = excluded.item_count,
+                    card_fingerprint = COALESCE(excluded.card_fingerprint, tracks.card_fingerprint),
+                    item_fingerprint = excluded.item_fingerprint,
+                    strategy = COALESCE(excluded.strategy, tracks.strategy),
+                    updated_at = excluded.updated_at
+            """, (slug, title, url, len(keys), card_fingerprint, item_fingerprint, strategy, timestamp))
+
+        return added, removed
+
+    def counts(self):
+        rows = self.connection().execute(
+            "SELECT type, status, COUNT(*) FROM items GROUP BY type, status")
+        return {(row[0], row[1]): row[2] for row in rows}
+
+    def import_once(self, path, load_rows):
+        """Pass the rows of a CSV to load_rows(conn, rows), then only the rows appended since.
+
+        imports records how many bytes were read and digests of their first
+        and last IMPORT_CHECK_BYTES. When those still match, the file only
+        grew and just the tail is read; otherwise it was rewritten (reparse,
+        hand edits) and is read again from the top, so load_rows must be
+        safe to repeat. A last line without its newline is left for the next
+        call. Returns True if any rows were read.
+        """
+        if not os.path.exists(path):
+            return False
+        key = os.path.abspath(path)
+        with open(path, 'rb') as f, self.transaction() as conn:
+            size = os.fstat(f.fileno()).st_size
+            seen = conn.execute("SELECT imported_bytes, head_digest, tail_digest FROM imports WHERE path = ?",
+                                (key,)).fetchone()
+            start = 0
+            done = seen['imported_bytes'] if seen else None
+            if done and done <= size and \
+                    _digest(f, 0, min(done, IMPORT_CHECK_BYTES)) == seen['head_digest'] and \
+                    _digest(f, max(0, done - IMPORT_CHECK_BYTES), done) == seen['tail_digest']:
+                start = done
+
+            f.seek(0)
+            header = f.readline()
+            f.seek(max(start, len(header)))
+            body = f.read(size - f.tell())
+            body = body[:body.rfind(b'\n') + 1]
+            end = max(start, len(header)) + len(body)
+            if start and end == start:
+                return False
+
+            header_cells = next(csv.reader([header.decode('utf-8-sig')]), [])
+            rows = item_rows(csv.reader(io.StringIO(body.decode('utf-8'), newline='')), header_cells)
+            load_rows(conn, rows)
+            conn.execute("""
+                INSERT INTO imports (path, imported_at, imported_bytes, head_digest, tail_digest)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET imported_at = excluded.imported_at,
+                                                imported_bytes = excluded.imported_bytes,
+                                                head_digest = excluded.head_digest,
+                                                tail_digest = excluded.tail_digest
+            """, (key, now(), end, _digest(f, 0, min(end, IMPORT_CHECK_BYTES)),
+                  _digest(f, max(0, end - IMPORT_CHECK_BYTES), end)))
+        return bool(rows)
+
+    def import_items_csv(self, items_csv):
+        def load_rows(conn, csv_rows):
+            timestamp = now()
+            rows = [(row['url'], canonical_key(row['url']), track_slug_from_url(row['url']), row.get('type'),
+                     row.get('title'), row.get('meta'), timestamp, timestamp)
+                    for row in csv_rows if row.get('url')]
+            conn.executemany("""
+                INSERT INTO items (url, canonical_key, track_slug, type, title, meta, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(canonical_key) DO NOTHING
+            """, rows)
+        return self.import_once(items_csv, load_rows)
+
+    def import_completed_csv(self, completed_csv):
+        def load_rows(conn, csv_rows):
+            rows = [(row['url'], canonical_key(row['url']), track_slug_from_url(row['url']),
+                     row.get('type') or 'article', row.get('title'),
+                     row.get('completed_at'), row.get('completed_at'), row.get('completed_at'))
+                    for row in csv_rows if row.get('url')]
+            conn.executemany("""
+                INSERT INTO items (url, canonical_key, track_slug, type, title, status, created_at, updated_at, completed_at)
+                VALUES (?, ?, ?, ?, ?, 'completed', ?, ?, ?)
+                ON CONFLICT(canonical_key) DO UPDATE SET status = 'completed', completed_at = excluded.completed_at
+            """, rows)
+        return self.import_once(completed_csv, load_rows)
+
+    def export_items_csv(self, items_csv, item_types=None):
+        """Write the store's items in module_items.csv format, optionally only those of item_types"""
+        query = "SELECT type, title, url, meta FROM items"
+        if item_types:
+            query += f" WHERE type IN ({','.join('?' * len(item_types))})"
+        rows = self.connection().execute(query + " ORDER BY rowid", list(item_types or []))
+        with open(items_csv, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['type', 'title', 'url', 'meta'])
+            rows = [tuple(row) for row in rows]
+            writer.writerows(rows)
+        return len(rows)
+
+    def export_completed_csv(self, completed_csv):
+        """Write the completed items in completed_articles.csv format, oldest first"""
+        rows = self.connection().execute(
+            "SELECT title, url, type, completed_at FROM items WHERE status = 'completed' ORDER BY completed_at, rowid")
+        with open(completed_csv, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['title', 'url', 'type', 'completed_at'])
+            rows = [tuple(row) for row in rows]
+            writer.writerows(rows)
+        return len(rows)
+
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute('COMMIT')
+        else:
+            self.conn.execute('ROLLBACK')
+        return False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the progress store to the CSV formats the scripts read')
+    parser.add_argument('command', choices=['export'])
+    parser.add_argument('--db', default='progress.db')
+    parser.add_argument('--items', default='module_items.csv', help='Where to write scraped items')
+    parser.add_argument('--types', default='video,article', help="Item types to export to --items, or 'all'")
+    parser.add_argument('--completed', default='completed_articles.csv', help='Where to write completed items')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} does not exist")
+    store = ProgressStore(args.db)
+    items = store.export_items_csv(args.items, None if args.types == 'all' else args.types.split(','))
+    completed = store.export_completed_csv(args.completed)
+    print(f"Exported {items} items to {args.items} and {completed} completed items to {args.completed}")
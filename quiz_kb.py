@@ -0,0 +1,193 @@
+import re
+import csv
+import json
+import mmap
+import struct
+import difflib
+import hashlib
+import argparse
+
+MAGIC = b'QKB1'
+# magic, record count, slots per table, offset of the data blob
+HEADER = struct.Struct('<4sIII')
+# open-addressing slot: 64-bit key, record number + 1 (0 marks an empty slot)
+SLOT = struct.Struct('<QI')
+# record table entry: offset and length of the record's JSON in the data blob
+RECORD = struct.Struct('<II')
+
+TAG = re.compile(r'<[^>]+>')
+# Only these entities are decoded, and &amp; last, so double-escaped code such as &amp;#39; keeps its entity
+ENTITIES = [('&nbsp;', ' '), ('&lt;', '<'), ('&gt;', '>'), ('&quot;', '"'), ('&amp;', '&')]
+NON_WORD = re.compile(r'[\W_]+')
+
+SEPARATOR = '=' * 50
+
+
+def html_to_text(fragment):
+    """Question/option HTML as plain text, the same way answers_list.txt renders it"""
+    text = TAG.sub('', fragment or '')
+    for entity, char in ENTITIES:
+        text = text.replace(entity, char)
+    return text.strip()
+
+
+def match_key(text):
+    """Lowercased words only, so spacing, punctuation and nbsp differences do not matter"""
+    return NON_WORD.sub(' ', text.lower()).strip()
+
+
+def text_hash(text):
+    return int.from_bytes(hashlib.blake2b(match_key(text).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def load_questions(questions_csv='quiz_questions.csv', answers_csv='quiz_answers.csv'):
+    """Normalized question records in first-seen order, one per question id"""
+    answers = {}
+    with open(answers_csv, 'r', newline='', encoding='utf-8-sig') as csvfile:
+        for row in csv.DictReader(csvfile):
+            answers[int(row['question_id'])] = int(row['correct_answer_id'])
+
+    records = {}
+    with open(questions_csv, 'r', newline='', encoding='utf-8-sig') as csvfile:
+        for row in csv.DictReader(csvfile):
+            question_id = int(row['question_id'])
+            if question_id in records:
+                continue
+            options = [[option['id'], html_to_text(option['text'])] for option in json.loads(row['options_json'])]
+            records[question_id] = {'id': question_id, 'question': html_to_text(row['question_text']),
+                                    'options': options, 'answer_id': answers.get(question_id)}
+    return list(records.values())
+
+
+def _table_size(count):
+    size = 8
+    while size < count * 2:
+        size *= 2
+    return size
+
+
+def _fill_table(keys, size):
+    slots = [(0, 0)] * size
+    for number, key in enumerate(keys):
+        slot = key & (size - 1)
+        while slots[slot][1]:
+            if slots[slot][0] == key:
+                break
+            slot = (slot + 1) & (size - 1)
+        else:
+            slots[slot] = (key, number + 1)
+    return b''.join(SLOT.pack(*entry) for entry in slots)
+
+
+def build(records, kb_path='quiz_kb.bin'):
+    """Write header, id table, text-hash table, record table, then the JSON records"""
+    blobs = [json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') for record in records]
+    size = _table_size(len(records))
+    id_table = _fill_table([record['id'] for record in records], size)
+    hash_table = _fill_table([text_hash(record['question']) for record in records], size)
+
+    data_offset = HEADER.size + 2 * size * SLOT.size + len(records) * RECORD.size
+    record_table = []
+    offset = data_offset
+    for blob in blobs:
+        record_table.append(RECORD.pack(offset, len(blob)))
+        offset += len(blob)
+
+    with open(kb_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(records), size, data_offset))
+        f.write(id_table)
+        f.write(hash_table)
+        f.write(b''.join(record_table))
+        f.write(b''.join(blobs))
+    return len(records)
+
+
+class QuizKnowledgeBase:
+    """Read-only view of a compiled knowledge base; records are decoded from the mmap on demand"""
+
+    def __init__(self, kb_path='quiz_kb.bin'):
+        with open(kb_path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.size, self.data_offset = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{kb_path} is not a quiz knowledge base")
+        self.id_table = HEADER.size
+        self.hash_table = self.id_table + self.size * SLOT.size
+        self.record_table = self.hash_table + self.size * SLOT.size
+        self._match_keys = None
+
+    def __len__(self):
+        return self.count
+
+    def record(self, number):
+        offset, length = RECORD.unpack_from(self.buffer, self.record_table + number * RECORD.size)
+        return json.loads(self.buffer[offset:offset + length].decode('utf-8'))
+
+    def _probe(self, table, key):
+        slot = key & (self.size - 1)
+        while True:
+            stored, number = SLOT.unpack_from(self.buffer, table + slot * SLOT.size)
+            if not number:
+                return None
+            if stored == key:
+                return number - 1
+            slot = (slot + 1) & (self.size - 1)
+
+    def by_id(self, question_id):
+        number = self._probe(self.id_table, int(question_id))
+        return None if number is None else self.record(number)
+
+    def by_text(self, question_text):
+        """Exact lookup by question text; accepts raw HTML or plain text"""
+        number = self._probe(self.hash_table, text_hash(html_to_text(question_text)))
+        return None if number is None else self.record(number)
+
+    def fuzzy(self, question_text, cutoff=0.8):
+        """Closest question for reworded text, or None below cutoff similarity"""
+        exact = self.by_text(question_text)
+        if exact:
+            return exact
+        if self._match_keys is None:
+            self._match_keys = {match_key(self.record(number)['question']): number for number in range(self.count)}
+        matches = difflib.get_close_matches(match_key(html_to_text(question_text)), self._match_keys, n=1, cutoff=cutoff)
+        return self.record(self._match_keys[matches[0]]) if matches else None
+
+    def records(self):
+        for number in range(self.count):
+            yield self.record(number)
+
+    def close(self):
+        self.buffer.close()
+
+
+def export_answers_list(records, path='answers_list.txt'):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(f"Question ID: {record['id']}\n")
+            f.write(f"Question: {record['question']}\n")
+            f.write("Options:\n")
+            for option_id, text in record['options']:
+                f.write(f"  ID {option_id}: {text}\n")
+            f.write(f"\n{SEPARATOR}\n\n")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compile and query the quiz knowledge base')
+    parser.add_argument('command', choices=['build', 'export', 'lookup'])
+    parser.add_argument('query', nargs='?', help='Question id or question text for lookup')
+    parser.add_argument('--kb', default='quiz_kb.bin')
+    parser.add_argument('--questions', default='quiz_questions.csv')
+    parser.add_argument('--answers', default='quiz_answers.csv')
+    parser.add_argument('--output', default='answers_list.txt')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        print(f"Compiled {build(load_questions(args.questions, args.answers), args.kb)} questions into {args.kb}")
+    elif args.command == 'export':
+        kb = QuizKnowledgeBase(args.kb)
+        export_answers_list(kb.records(), args.output)
+        print(f"Wrote {len(kb)} questions to {args.output}")
+    else:
+        kb = QuizKnowledgeBase(args.kb)
+        record = kb.by_id(args.query) if (args.query or '').isdigit() else kb.fuzzy(args.query or '')
+        print(json.dumps(record, indent=2, ensure_ascii=False) if record else "No match")
@@ -0,0 +1,149 @@
+import csv
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+import requests
+
+from fetch_backend import HttpFetcher
+from progress_store import ProgressStore
+from session import is_login_page
+from url_canon import decode_item_id
+
+# Answers are POSTed as {"question_id": ..., "answer_id": ...}. The site's real endpoint
+# is not known yet, so there is no default: pass --submit-url (e.g. replay_server.py --quiz-stub)
+SUBMIT_URL = None
+
+
+def question_id_from_url(url):
+    """.../quiz/NDAwNzg= -> 40078, or None if the URL carries no quiz id"""
+    segments = urlsplit(url or '').path.rstrip('/').split('/')
+    for i in range(1, len(segments)):
+        if segments[i - 1] == 'quiz':
+            question_id = decode_item_id(unquote(segments[i]))
+            return int(question_id) if question_id.isdigit() else None
+    return None
+
+
+def load_answers(answers_csv='quiz_answers.csv'):
+    """{question_id: correct_answer_id}"""
+    answers = {}
+    with open(answers_csv, 'r', newline='', encoding='utf-8-sig') as csvfile:
+        for row in csv.DictReader(csvfile):
+            if row.get('question_id') and row.get('correct_answer_id'):
+                answers[int(row['question_id'])] = int(row['correct_answer_id'])
+    return answers
+
+
+def plan_submissions(quiz_items, answers):
+    """Join quiz items against the answer table; returns (submissions, unanswered items).
+
+    A question listed under several tracks is submitted once and all of its
+    URLs share the outcome.
+    """
+    submissions = {}
+    unanswered = []
+    for item in quiz_items:
+        question_id = question_id_from_url(item['url'])
+        if question_id not in answers:
+            unanswered.append(item)
+        elif question_id in submissions:
+            submissions[question_id]['items'].append(item)
+        else:
+            submissions[question_id] = {'question_id': question_id, 'answer_id': answers[question_id],
+                                        'items': [item]}
+    return list(submissions.values()), unanswered
+
+
+class QuizRunner:
+    """Submit known answers over one pooled HTTP session, recording a status per question"""
+
+    def __init__(self, fetcher, store, submit_url, workers=8):
+        self.fetcher = fetcher
+        self.store = store
+        self.submit_url = submit_url
+        self.workers = workers
+        self.statuses = {}
+
+    def submit(self, submission):
+        """POST one answer; returns 'completed', 'rejected', 'auth' or 'failed'"""
+        try:
+            response = self.fetcher.session.post(
+                self.submit_url, timeout=self.fetcher.timeout,
+                json={'question_id': submission['question_id'], 'answer_id': submission['answer_id']})
+        except requests.RequestException as e:
+            print(f"Submit failed for question {submission['question_id']}: {e}")
+            return 'failed'
+
+        if response.status_code in (401, 403) or is_login_page(response.text):
+            return 'auth'
+        if response.status_code != 200:
+            return 'failed'
+        try:
+            result = response.json()
+        except ValueError:
+            return 'failed'
+        return 'rejected' if result.get('correct') is False else 'completed'
+
+    def run_one(self, submission):
+        status = self.submit(submission)
+        for item in submission['items']:
+            if status == 'completed':
+                self.store.mark_completed(item['url'], item.get('title'), item_type='quiz')
+            else:
+                self.store.set_status(item['url'], status, item.get('title'), item_type='quiz')
+        self.statuses[submission['question_id']] = status
+        return status
+
+    def run(self, submissions):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for status in executor.map(self.run_one, submissions):
+                if status == 'auth':
+                    print("Session rejected by the server; refresh cookies.json and re-run")
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    break
+        return self.statuses
+
+
+def run_quizzes(quiz_items_csv='quiz_items.csv', answers_csv='quiz_answers.csv', cookies_file='cookies.json',
+                progress_db='progress.db', submit_url=SUBMIT_URL, workers=8):
+    if not submit_url:
+        print("No quiz submit endpoint given; pass --submit-url")
+        return {}
+    store = ProgressStore(progress_db)
+    store.import_items_csv(quiz_items_csv)
+
+    submissions, unanswered = plan_submissions(store.pending_items('quiz'), load_answers(answers_csv))
+    for item in unanswered:
+        store.set_status(item['url'], 'no_answer', item.get('title'), item_type='quiz')
+    print(f"{len(submissions)} quiz questions to submit, {len(unanswered)} without a known answer")
+    if not submissions:
+        return {}
+
+    fetcher = HttpFetcher(cookies_file, pool_size=workers)
+    try:
+        start = time.time()
+        statuses = QuizRunner(fetcher, store, submit_url, workers).run(submissions)
+    finally:
+        fetcher.close()
+
+    totals = {}
+    for status in statuses.values():
+        totals[status] = totals.get(status, 0) + 1
+    print(f"Submitted {len(statuses)} answers in {time.time() - start:.1f}s: "
+          + ', '.join(f"{count} {status}" for status, count in sorted(totals.items())))
+    return statuses
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Submit known quiz answers from quiz_answers.csv')
+    parser.add_argument('--items', default='quiz_items.csv')
+    parser.add_argument('--answers', default='quiz_answers.csv')
+    parser.add_argument('--cookies', default='cookies.json')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent submissions')
+    parser.add_argument('--submit-url', required=SUBMIT_URL is None, default=SUBMIT_URL,
+                        help='Answer endpoint; point at replay_server.py --quiz-stub to test locally')
+    args = parser.parse_args()
+
+    run_quizzes(args.items, args.answers, args.cookies, submit_url=args.submit_url, workers=args.workers)
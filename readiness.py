@@ -0,0 +1,126 @@
+import time
+import threading
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from timing import span
+
+POLL_INTERVAL = 0.1
+
+_wait_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(label, elapsed, budget, ready):
+    with _stats_lock:
+        stats = _wait_stats.setdefault(label, {'count': 0, 'waited': 0.0, 'budget': 0.0, 'timeouts': 0})
+        stats['count'] += 1
+        stats['waited'] += elapsed
+        stats['budget'] += budget
+        if not ready:
+            stats['timeouts'] += 1
+
+
+def wait_until(driver, condition, timeout, label, budget=None):
+    """Poll condition(driver) until it is truthy or timeout expires.
+
+    budget is the fixed sleep this wait replaces; it is only used for the
+    report. Returns the condition's result, or False on timeout.
+    """
+    start = time.time()
+    result = False
+    try:
+        with span(f"wait {label}"):
+            result = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        pass
+    _record(label, time.time() - start, budget if budget is not None else timeout, bool(result))
+    return result
+
+
+def document_ready(driver):
+    return driver.execute_script("return document.readyState") == 'complete'
+
+
+def element_or_login(by, value):
+    """Ready once the target element is present or the page turned out to be a login page"""
+    def condition(driver):
+        if driver.find_elements(by, value):
+            return True
+        if not document_ready(driver):
+            return False
+        body_text = driver.execute_script("return document.body ? document.body.innerText.toLowerCase() : ''")
+        return 'login' in body_text or 'sign in' in body_text
+    return condition
+
+
+def has_class(element, class_name):
+    def condition(driver):
+        return class_name in (element.get_attribute('class') or '')
+    return condition
+
+
+def button_state_changed(element):
+    """Ready once a clicked button is removed, disabled or relabelled.
+
+    The click script stores the pre-click state in data-state-before.
+    """
+    def condition(driver):
+        try:
+            return driver.execute_script(
+                "const el = arguments[0];"
+                "return [el.textContent, el.disabled, el.className].join('|') !== el.getAttribute('data-state-before');",
+                element
+            )
+        except StaleElementReferenceException:
+            return True
+    return condition
+
+
+def count_settled(by, value, settle_time=0.3):
+    """Ready once there is at least one match and the match count stopped changing"""
+    state = {'count': -1, 'since': time.time()}
+
+    def condition(driver):
+        count = len(driver.find_elements(by, value))
+        now = time.time()
+        if count != state['count']:
+            state['count'] = count
+            state['since'] = now
+            return False
+        return count > 0 and now - state['since'] >= settle_time
+    return condition
+
+
+def wait_for_page(driver, by, value, timeout, label):
+    return wait_until(driver, element_or_login(by, value), timeout, label)
+
+
+def wait_for_document(driver, timeout, label):
+    return wait_until(driver, document_ready, timeout, label)
+
+
+def wait_for_tab(driver, tab, item_class, budget, label, timeout=10):
+    """Wait for a clicked tab to become active and its item list to settle"""
+    ready = wait_until(driver, has_class(tab, 'active'), timeout, f"{label} (active)", budget=0)
+    settled = wait_until(driver, count_settled(By.CLASS_NAME, item_class), timeout, label, budget=budget)
+    return ready and settled
+
+
+def report_waits():
+    with _stats_lock:
+        stats = dict(_wait_stats)
+
+    if not stats:
+        return
+
+    print("\nReadiness waits (actual vs old fixed budget):")
+    total_waited = 0.0
+    total_budget = 0.0
+    for label, s in sorted(stats.items()):
+        total_waited += s['waited']
+        total_budget += s['budget']
+        print(f"  {label}: {s['count']} waits, {s['waited']:.1f}s waited, "
+              f"{s['budget']:.1f}s budget, {s['timeouts']} timeouts")
+    print(f"  Total: {total_waited:.1f}s waited vs {total_budget:.1f}s of fixed sleeps")
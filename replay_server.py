@@ -0,0 +1,120 @@
+import os
+import json
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from network_capture import load_recordings
+from snapshot_store import SnapshotStore
+
+
+def make_replay_handler(responses, snapshots=None):
+    """Serve recorded JSON bodies by path and query string, and stored HTML snapshots by path"""
+    pages = {}
+    if snapshots is not None:
+        # Prefer the 'all' view of a track, then whichever tab was captured first
+        for entry in snapshots.entries():
+            path = urlsplit(entry['url']).path
+            if path not in pages or entry['tab'] == 'all':
+                pages[path] = entry['digest']
+
+    by_path = {}
+    for response in responses:
+        parts = urlsplit(response['url'])
+        by_path[f"{parts.path}?{parts.query}"] = response
+        by_path.setdefault(parts.path, response)
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            response = by_path.get(f"{parts.path}?{parts.query}") or by_path.get(parts.path)
+            if not response:
+                if parts.path in pages:
+                    self.send_page(snapshots.get(pages[parts.path]))
+                else:
+                    self.send_error(404)
+                return
+
+            body = json.dumps(response['body']).encode('utf-8')
+            self.send_response(response.get('status') or 200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_page(self, page_html):
+            body = page_html.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+def make_quiz_stub_handler(answers):
+    """Accept quiz submissions and grade them against {question_id: correct_answer_id}"""
+
+    class QuizStubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                submission = json.loads(self.rfile.read(length) or b'{}')
+                question_id = int(submission['question_id'])
+                answer_id = int(submission['answer_id'])
+            except (ValueError, KeyError, TypeError):
+                self.send_error(400)
+                return
+            if question_id not in answers:
+                self.send_error(404)
+                return
+
+            body = json.dumps({'question_id': question_id, 'correct': answers[question_id] == answer_id}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return QuizStubHandler
+
+
+def start_quiz_stub(answers, port=0):
+    """Start a local quiz answer endpoint; returns (server, submit_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_quiz_stub_handler(answers))
+    return server, f"http://127.0.0.1:{server.server_address[1]}/quiz/submit"
+
+
+def start_replay_server(recordings_dir='recordings', port=0, snapshot_dir=None):
+    """Start a local stand-in for the site from recordings and snapshots; returns (server, base_url)"""
+    snapshots = SnapshotStore(snapshot_dir) if snapshot_dir else None
+    handler = make_replay_handler(load_recordings(recordings_dir), snapshots)
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve recorded JSON responses and HTML snapshots as a local stand-in site')
+    parser.add_argument('recordings', nargs='?', default='recordings')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--snapshots', help='Also serve HTML pages from this snapshot store')
+    parser.add_argument('--quiz-stub', metavar='ANSWERS_CSV',
+                        help='Instead of replaying, grade quiz submissions against this answers CSV')
+    args = parser.parse_args()
+
+    if args.quiz_stub:
+        from quiz_runner import load_answers
+        server, submit_url = start_quiz_stub(load_answers(args.quiz_stub), args.port)
+        print(f"Grading quiz submissions on {submit_url}")
+        server.serve_forever()
+
+    server, base_url = start_replay_server(os.path.abspath(args.recordings), args.port, args.snapshots)
+    print(f"Replaying {args.recordings} on {base_url}")
+    server.serve_forever()
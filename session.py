@@ -0,0 +1,109 @@
+import os
+import json
+import threading
+
+from browser_profile import record_page
+from timing import span
+
+BASE_URL = "https://www.geeksforgeeks.org"
+
+_cookie_cache = {}
+_cookie_lock = threading.Lock()
+
+_auth_failures = 0
+_auth_lock = threading.Lock()
+
+
+def _cookie_file_key(cookies_file):
+    stat = os.stat(cookies_file)
+    return (os.path.abspath(cookies_file), stat.st_mtime_ns, stat.st_size)
+
+
+def read_cookies(cookies_file='cookies.json'):
+    """Parse the cookie file once; re-read only when it changes on disk"""
+    key = _cookie_file_key(cookies_file)
+    with _cookie_lock:
+        cached = _cookie_cache.get(key[0])
+        if cached and cached[0] == key:
+            return cached[1]
+
+        with open(cookies_file, 'r') as f:
+            cookies = json.load(f)
+
+        for cookie in cookies:
+            if 'expiry' in cookie and cookie['expiry']:
+                cookie['expiry'] = int(cookie['expiry'])
+
+        _cookie_cache[key[0]] = (key, cookies)
+        return cookies
+
+
+def note_auth_failure():
+    global _auth_failures
+    with _auth_lock:
+        _auth_failures += 1
+
+
+def auth_failures():
+    """How many page loads have ended on a login page so far, across all threads"""
+    return _auth_failures
+
+
+def is_login_page(page_source):
+    page_text = page_source.lower()
+    return "login" in page_text or "sign in" in page_text or "please click on login button" in page_text
+
+
+def seed_driver(driver, cookies_file='cookies.json', force=False):
+    """Add the saved cookies to driver, once per driver and cookie file version"""
+    try:
+        key = _cookie_file_key(cookies_file)
+        if not force and getattr(driver, '_session_key', None) == key:
+            return True
+
+        with span('load_cookies'):
+            cookies = read_cookies(cookies_file)
+            driver.get(BASE_URL)
+
+            for cookie in cookies:
+                try:
+                    driver.add_cookie(dict(cookie))
+                except Exception:
+                    pass
+
+        driver._session_key = key
+        print("Cookies loaded")
+        return True
+
+    except Exception as e:
+        print(f"Cookie error: {e}")
+        return False
+
+
+def get_authenticated(driver, url, cookies_file='cookies.json', wait=None):
+    """Load url with a seeded session, re-seeding once if we land on a login page.
+
+    wait(driver) is called after every navigation, before the login check.
+    Returns False if the page still asks for a login after re-seeding.
+    """
+    if not seed_driver(driver, cookies_file):
+        return False
+
+    for attempt in range(2):
+        with span('driver.get'):
+            driver.get(url)
+        if wait:
+            with span('page wait'):
+                wait(driver)
+        record_page(driver, url)
+
+        if not is_login_page(driver.page_source):
+            return True
+
+        if attempt == 0:
+            print("Session looks logged out, re-seeding cookies...")
+            if not seed_driver(driver, cookies_file, force=True):
+                return False
+
+    note_auth_failure()
+    return False
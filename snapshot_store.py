@@ -0,0 +1,76 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import threading
+
+
+class SnapshotStore:
+    """Content-addressed, gzip-compressed store of fetched page_source snapshots.
+
+    Pages live under objects/<aa>/<sha256>.html.gz, so identical pages are
+    stored once. index.jsonl records every capture (url, tab, kind, digest and
+    any extra fields) in fetch order.
+    """
+
+    def __init__(self, root='snapshots'):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.index_file = os.path.join(root, 'index.jsonl')
+        self.lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.html.gz")
+
+    def put(self, url, tab, page_html, kind, **extra):
+        data = page_html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        entry = {'url': url, 'tab': tab, 'kind': kind, 'digest': digest,
+                 'fetched_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+        entry.update(extra)
+
+        with self.lock:
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+
+        return digest
+
+    def get(self, digest):
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def entries(self, kind=None):
+        """Latest capture per (url, tab, kind), in order of first capture"""
+        latest = {}
+        if not os.path.exists(self.index_file):
+            return []
+
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # partially written line from an interrupted run
+                if kind and entry.get('kind') != kind:
+                    continue
+                key = (entry['url'], entry['tab'], entry['kind'])
+                if key in latest:
+                    latest[key].update(entry)
+                else:
+                    latest[key] = entry
+
+        return list(latest.values())
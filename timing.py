@@ -0,0 +1,181 @@
+import io
+import sys
+import json
+import time
+import queue
+import logging
+import threading
+import contextlib
+from logging.handlers import QueueHandler, QueueListener
+
+_spans = []
+_spans_lock = threading.Lock()
+_local = threading.local()
+
+_listener = None
+_real_stdout = None
+_format = None
+
+
+@contextlib.contextmanager
+def span(phase):
+    """Time the enclosed block as `phase`, attributed to the thread's current track.
+
+    Spans nest: besides its full time each span records its self time, the
+    part not covered by spans opened inside it, so totals are not counted twice.
+    """
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        with _spans_lock:
+            _spans.append((phase, getattr(_local, 'track', None), elapsed, elapsed - nested))
+
+
+@contextlib.contextmanager
+def track_span(track):
+    """Attribute spans inside the block to `track` and time the whole block as phase 'track'"""
+    previous = getattr(_local, 'track', None)
+    _local.track = track
+    try:
+        with span('track'):
+            yield
+    finally:
+        _local.track = previous
+
+
+class _QueuedLines(io.TextIOBase):
+    """sys.stdout replacement: buffers each thread's writes until a newline, then logs whole lines"""
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.buffers = threading.local()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        pending = getattr(self.buffers, 'text', '') + text
+        *lines, self.buffers.text = pending.split('\n')
+        for line in lines:
+            self.logger.info(line)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def install_queued_output(fmt='%(threadName)s | %(message)s'):
+    """Route print() from every thread through a queue drained by one writer thread.
+
+    Lines are never interleaved mid-way and worker threads never block on the
+    terminal. Call stop_queued_output() at the end of the run to flush.
+    """
+    global _listener, _real_stdout, _format
+    if _listener:
+        return
+    _real_stdout = sys.stdout
+    _format = fmt
+    handler = logging.StreamHandler(_real_stdout)
+    handler.setFormatter(logging.Formatter(fmt))
+
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger('scraper.output')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [QueueHandler(log_queue)]
+
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+    sys.stdout = _QueuedLines(logger)
+
+
+def stop_queued_output():
+    global _listener
+    if not _listener:
+        return
+    sys.stdout = _real_stdout
+    _listener.stop()
+    _listener = None
+
+
+def ask(prompt=''):
+    """input() that shows its prompt while queued output is installed.
+
+    Queued output only forwards whole lines, so the prompt would otherwise
+    appear after Enter is pressed. Pending lines are flushed first.
+    """
+    if not _listener:
+        return input(prompt)
+    fmt = _format
+    stop_queued_output()
+    try:
+        return input(prompt)
+    finally:
+        install_queued_output(fmt)
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def _summary(samples):
+    values = sorted(elapsed for elapsed, _ in samples)
+    return {'count': len(values), 'total': round(sum(values), 3),
+            'self': round(sum(self_time for _, self_time in samples), 3),
+            'p50': round(_percentile(values, 0.5), 3), 'p95': round(_percentile(values, 0.95), 3),
+            'max': round(values[-1], 3)}
+
+
+def report_spans(path=None):
+    """Print p50/p95/max per phase and the slowest tracks; optionally save the full report as JSON.
+
+    Phases are ranked by self time, which adds up across nested spans; p50,
+    p95 and max are over each span's full time. Per track, 'track' is the
+    whole track and the other phases are self times.
+    """
+    with _spans_lock:
+        spans = list(_spans)
+    if not spans:
+        return None
+
+    by_phase = {}
+    by_track = {}
+    for phase, track, elapsed, self_time in spans:
+        by_phase.setdefault(phase, []).append((elapsed, self_time))
+        if track is not None:
+            by_track.setdefault(track, {}).setdefault(phase, []).append(elapsed if phase == 'track' else self_time)
+
+    report = {
+        'phases': {phase: _summary(values) for phase, values in by_phase.items()},
+        'tracks': {track: {phase: round(sum(values), 3) for phase, values in phases.items()}
+                   for track, phases in by_track.items()},
+    }
+
+    print("\nRun profile (seconds):")
+    print(f"  {'phase':<24}{'count':>7}{'self':>10}{'total':>10}{'p50':>9}{'p95':>9}{'max':>9}")
+    for phase, s in sorted(report['phases'].items(), key=lambda item: -item[1]['self']):
+        print(f"  {phase:<24}{s['count']:>7}{s['self']:>10.2f}{s['total']:>10.2f}"
+              f"{s['p50']:>9.3f}{s['p95']:>9.3f}{s['max']:>9.3f}")
+
+    slowest = sorted(report['tracks'].items(), key=lambda item: -item[1].get('track', 0))[:5]
+    if slowest:
+        print("  Slowest tracks:")
+        for track, phases in slowest:
+            top = max((item for item in phases.items() if item[0] != 'track'), key=lambda item: item[1], default=None)
+            detail = f", mostly {top[0]} ({top[1]:.2f}s)" if top else ''
+            print(f"    {track}: {phases.get('track', 0):.2f}s{detail}")
+
+    if path:
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"  Full profile saved to {path}")
+    return report
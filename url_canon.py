@@ -0,0 +1,83 @@
+import re
+import csv
+import base64
+import binascii
+from urllib.parse import quote, unquote, urljoin, urlsplit, urlencode, parse_qsl
+
+from session import BASE_URL
+
+# Path segments followed by a base64-encoded numeric item id, e.g. video/MjM4OQ%3D%3D -> video/2389
+ID_SEGMENTS = {'video', 'article', 'quiz'}
+NUMERIC = re.compile(r'^\d+$')
+
+
+def decode_item_id(segment):
+    """'MjM4OQ==' -> '2389'; anything that is not base64 of a number is returned unchanged"""
+    padded = segment + '=' * (-len(segment) % 4)
+    try:
+        decoded = base64.b64decode(padded, validate=True).decode('ascii')
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return segment
+    return decoded if NUMERIC.match(decoded) else segment
+
+
+def canonical_url(url, base_url=BASE_URL):
+    """Absolute https URL with a lowercase host, normalised percent-encoding, no fragment and sorted query"""
+    url = (url or '').strip()
+    if not url.startswith('http'):
+        url = urljoin(base_url + '/', url)
+
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if host == 'geeksforgeeks.org':
+        host = 'www.geeksforgeeks.org'
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = '/'.join(quote(unquote(segment), safe="-._~!$&'()*+,;=:@") for segment in parts.path.split('/'))
+    path = path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+    canonical = f"https://{host}{path}"
+    if query:
+        canonical += f"?{query}"
+    return canonical
+
+
+def canonical_key(url, base_url=BASE_URL):
+    """Dedup key: canonical URL without scheme, with base64 item ids decoded"""
+    parts = urlsplit(canonical_url(url, base_url))
+    segments = parts.path.split('/')
+    for i in range(1, len(segments)):
+        if segments[i - 1] in ID_SEGMENTS:
+            segments[i] = decode_item_id(unquote(segments[i]))
+
+    key = parts.netloc + '/'.join(segments)
+    if parts.query:
+        key += f"?{parts.query}"
+    return key
+
+
+def clean_fieldname(name):
+    """Strip BOMs and stray quotes from a header cell: '\\ufeff"type"' -> 'type'"""
+    return name.replace('\ufeff', '').strip().strip('"').strip()
+
+
+def read_item_rows(path):
+    """Read an items CSV with normalised headers; for duplicate columns the first non-empty value wins"""
+    with open(path, 'r', newline='', encoding='utf-8-sig') as csvfile:
+        reader = csv.reader(csvfile)
+        return item_rows(reader, next(reader, []))
+
+
+def item_rows(reader, header):
+    """Rows of a csv.reader as dicts keyed by the cleaned header cells, as read_item_rows does"""
+    header = [clean_fieldname(name) for name in header]
+    rows = []
+    for values in reader:
+        row = {}
+        for name, value in zip(header, values):
+            if not row.get(name):
+                row[name] = value
+        rows.append(row)
+    return rows